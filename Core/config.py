@@ -17,6 +17,96 @@ class Settings(BaseSettings):
     LLM_MODEL: str = "llama3-groq-70b-8192-tool-use-preview"  # Fast tool-calling model
     LLM_TEMPERATURE: float = 0.7
     LLM_MAX_TOKENS: int = 800
+    # "llm": always format tool results with a second LLM call
+    # "auto": local templates for simple single-city questions, LLM otherwise
+    # "template": local templates whenever the result fits one
+    WEATHER_RESPONSE_MODE: str = "auto"
+
+    # OpenWeather HTTP client (shared, pooled connection)
+    OPENWEATHER_TIMEOUT: float = 20.0
+    OPENWEATHER_MAX_CONNECTIONS: int = 100
+    OPENWEATHER_MAX_KEEPALIVE: int = 20
+    OPENWEATHER_KEEPALIVE_EXPIRY: float = 30.0
+    OPENWEATHER_HTTP2: bool = True
+
+    # Weather result cache (in-process LRU, TTL in seconds)
+    WEATHER_CACHE_ENABLED: bool = True
+    WEATHER_CACHE_BACKEND: str = "memory"  # "redis" adds a shared cache behind the in-process one
+    WEATHER_CACHE_MAX_SIZE: int = 1024
+    WEATHER_CACHE_TTL: float = 600.0
+    FORECAST_CACHE_TTL: float = 1800.0
+    # Stale-while-revalidate: an expired entry is still served for this long while one
+    # background refresh runs (0 = callers wait for upstream once an entry expires)
+    WEATHER_CACHE_STALE_TTL: float = 300.0
+    # Expired entries are kept this long as the fallback answer when OpenWeather fails
+    # (errors, rate limit, open circuit breaker)
+    WEATHER_CACHE_OUTAGE_TTL: float = 3600.0
+
+    # Refresh-ahead for the most requested locations (MCP server only): every INTERVAL
+    # seconds the TOP_N hottest entries expiring within REFRESH_AHEAD seconds are refetched.
+    # Popularity is a request count halving every HALF_LIFE seconds; one-off lookups
+    # (score below MIN_SCORE) are never refreshed
+    CACHE_WARMER_ENABLED: bool = True
+    CACHE_WARMER_TOP_N: int = 20
+    CACHE_WARMER_INTERVAL: float = 30.0
+    CACHE_WARMER_REFRESH_AHEAD: float = 60.0
+    CACHE_WARMER_HALF_LIFE: float = 1800.0
+    CACHE_WARMER_MIN_SCORE: float = 1.5
+
+    # Bundled city index: known cities are fetched by coordinates and cached under a
+    # canonical id ("NYC" == "New York" == "new york,US"); unknown names still go as q=
+    GAZETTEER_ENABLED: bool = True
+
+    # Outbound resilience for OpenWeather and Groq: token-bucket rate limits matching the
+    # API quotas (0 = unlimited; a call that would wait longer than RATE_LIMIT_MAX_WAIT
+    # fails fast), jittered retries of transient errors honoring Retry-After, and a
+    # circuit breaker that fails fast after consecutive failures (weather then falls
+    # back to the stale cache)
+    OPENWEATHER_RATE_LIMIT_PER_MINUTE: float = 60.0
+    OPENWEATHER_RATE_LIMIT_BURST: int = 10
+    GROQ_RATE_LIMIT_PER_MINUTE: float = 30.0
+    GROQ_RATE_LIMIT_BURST: int = 5
+    RATE_LIMIT_MAX_WAIT: float = 5.0
+    UPSTREAM_RETRY_ATTEMPTS: int = 3
+    UPSTREAM_RETRY_BASE_DELAY: float = 0.5
+    UPSTREAM_RETRY_MAX_DELAY: float = 8.0
+    CIRCUIT_BREAKER_FAILURES: int = 5
+    CIRCUIT_BREAKER_RESET: float = 30.0
+
+    # Tool execution (one chat turn may request several tool calls)
+    TOOL_CALL_CONCURRENCY: int = 4
+    TOOL_CALL_TIMEOUT: float = 15.0
+    MCP_BATCH_MAX_SIZE: int = 20
+
+    # Chatbot -> MCP server client
+    MCP_CLIENT_MAX_CONNECTIONS: int = 50
+    MCP_CLIENT_MAX_KEEPALIVE: int = 20
+    MCP_CLIENT_KEEPALIVE_EXPIRY: float = 60.0
+    MCP_IN_PROCESS: bool = False  # call the MCP app directly instead of over the network
+
+    # Conversation history store: "memory" (plain dict, unbounded), "bounded" (LRU + idle TTL)
+    # or "redis" (shared across workers/nodes)
+    SESSION_STORE_BACKEND: str = "memory"
+    SESSION_MAX_SESSIONS: int = 10000
+    SESSION_IDLE_TTL: float = 3600.0
+    SESSION_MAX_BYTES: int = 0  # 0 = no memory cap
+
+    # Local pre-classifier: canned replies for greetings/thanks, direct tool calls for
+    # explicit "weather in <city>" / "forecast for <city>" (skips the first LLM call)
+    INTENT_ROUTER_ENABLED: bool = True
+
+    # Cache for tool-free LLM replies (greetings, small talk): exact normalized text,
+    # then embedding similarity >= RESPONSE_CACHE_SIMILARITY (0 = exact only)
+    RESPONSE_CACHE_ENABLED: bool = False
+    RESPONSE_CACHE_MAX_SIZE: int = 1000
+    RESPONSE_CACHE_TTL: float = 3600.0
+    RESPONSE_CACHE_SIMILARITY: float = 0.92
+    RESPONSE_CACHE_MAX_WORDS: int = 12
+
+    # Redis (only used when a backend above is set to "redis")
+    REDIS_URL: str = "redis://localhost:6379/0"
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_KEY_PREFIX: str = "weatherbot:"
 
     # Old project leftovers (unchanged)
     APP_NAME: str = "WeatherChatBoT"
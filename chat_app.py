@@ -2,9 +2,11 @@
 import streamlit as st
 import requests
 import time
+import json
 from datetime import datetime
 
 API_URL = "http://127.0.0.1:8000/chat"
+STREAM_URL = f"{API_URL}/stream"
 SESSION_ID = "default"
 
 st.set_page_config(page_title="Weather Chatbot", page_icon="☁️")
@@ -32,22 +34,40 @@ if submit_button and user_input:
     # Add user message
     st.session_state.messages.append({"role": "user", "content": user_input})
 
-    # Show "thinking" message
+    # Show "thinking" message, then fill it in as tokens arrive
     with chat_container:
         with st.chat_message("assistant"):
-            st.write("Thinking...")
+            placeholder = st.empty()
+            placeholder.write("Thinking...")
     
-    # Call FastAPI
+    # Call FastAPI (Server-Sent Events stream)
     try:
-        response = requests.post(
-            API_URL,
+        data = {}
+        streamed = ""
+        with requests.post(
+            STREAM_URL,
             params={"session_id": SESSION_ID, "use_context": "true"},
             json={"message": user_input},
-            timeout=30
-        )
-        response.raise_for_status()
-        data = response.json()
-        bot_reply = data.get("response", "Sorry, I couldn't get a response.")
+            timeout=30,
+            stream=True
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data: "):
+                    continue
+                event = json.loads(line[len("data: "):])
+                if event["type"] == "token":
+                    streamed += event["content"]
+                    placeholder.markdown(streamed + "▌")
+                elif event["type"] == "tool_calls":
+                    streamed = ""  # the formatted answer replaces any preamble
+                    placeholder.markdown("_Checking the weather..._")
+                elif event["type"] == "done":
+                    data = event["data"]
+                elif event["type"] == "error":
+                    data = {"response": event["content"]}
+
+        bot_reply = data.get("response") or streamed or "Sorry, I couldn't get a response."
 
         # Add weather details if available
         weather = data.get("weather_data")
@@ -1,14 +1,28 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from Core.config import settings
-from services.chat.chatbot_route import router as chat_router
+from services.chat.chatbot_route import router as chat_router, chatbot
 from services.ai_suggestions.ai_suggestions_route import router as suggestions_router
+from utils.redis_client import close_redis_client
+from contextlib import asynccontextmanager
 import uvicorn
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Long-lived keep-alive client from the chatbot to the MCP server
+    await chatbot.start()
+    yield
+    await chatbot.close()
+    await close_redis_client()
+
+
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
-    description="Weather Chatbot API with LLM Integration and MCP Server"
+    description="Weather Chatbot API with LLM Integration and MCP Server",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -30,6 +44,7 @@ async def root():
         "endpoints": {
             "/chat": "Chat with weather bot",
             "/suggestions": "Get AI suggestions",
+            "/ready": "Readiness probe",
             "/docs": "API documentation"
         }
     }
@@ -38,6 +53,16 @@ async def root():
 async def health():
     return {"status": "healthy", "service": settings.APP_NAME}
 
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 503 until background warm-up (vector store) has finished"""
+    vector_status = chatbot.vector_store_loader.get_status()
+    is_ready = vector_status["state"] in ("disabled", "ready", "failed")
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={"ready": is_ready, "vector_store": vector_status}
+    )
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
@@ -1,9 +1,27 @@
 from fastapi import FastAPI, Body
 from fastapi.middleware.cors import CORSMiddleware
 from utils.weather_service import WeatherService
+from utils.redis_client import close_redis_client
+from Core.config import settings
 from typing import Dict
+from contextlib import asynccontextmanager
+import asyncio
 
-app = FastAPI(title="MCP Server")
+weather_service = WeatherService()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled OpenWeather client for the lifetime of the server
+    await weather_service.start()
+    # Keep popular cities fresh so their requests never wait on OpenWeather
+    weather_service.start_warmer()
+    yield
+    await weather_service.close()
+    await close_redis_client()
+
+
+app = FastAPI(title="MCP Server", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -12,23 +30,17 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
-weather_service = WeatherService()
-
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
 
-@app.post("/mcp/invoke")
-async def invoke_tool(
-    body: Dict = Body(...)
-):
-    """
-    MCP tool invocation endpoint.
-    Expects JSON body: {"method": "get_weather", "params": {"city": "Dhaka"}}
-    """
-    method = body.get("method")
-    params = body.get("params", {})
+@app.get("/mcp/stats")
+async def stats():
+    return {"weather_cache": weather_service.get_cache_stats()}
 
+async def dispatch(method: str, params: Dict) -> Dict:
+    """Run one tool and wrap the outcome the way /mcp/invoke returns it"""
+    params = params or {}
     try:
         if method == "get_weather":
             city = params.get("city")
@@ -39,11 +51,60 @@ async def invoke_tool(
         elif method == "get_forecast":
             city = params.get("city")
             country_code = params.get("country_code")
-            days = params.get("days", 3)
-            data = await weather_service.get_forecast(city, country_code, days=5)
-            return {"result": {"data": data}}  
+            # OpenWeather's /forecast covers 5 days (3-hour steps)
+            days = min(max(int(params.get("days") or 5), 1), 5)
+            data = await weather_service.get_forecast(city, country_code, days=days)
+            return {"result": {"data": data}}
         else:
             return {"error": f"Unknown method: {method}"}
 
     except Exception as e:
         return {"error": str(e)}
+
+
+@app.post("/mcp/invoke")
+async def invoke_tool(
+    body: Dict = Body(...)
+):
+    """
+    MCP tool invocation endpoint.
+    Expects JSON body: {"method": "get_weather", "params": {"city": "Dhaka"}}
+    """
+    return await dispatch(body.get("method"), body.get("params", {}))
+
+
+@app.post("/mcp/invoke_batch")
+async def invoke_batch(
+    body: Dict = Body(...)
+):
+    """
+    Batch MCP tool invocation endpoint.
+    Expects JSON body: {"calls": [{"method": "get_weather", "params": {"city": "Paris"}}, ...]}
+    Returns {"results": [...]} in the same order, each item shaped like an /mcp/invoke response.
+    """
+    calls = body.get("calls") or []
+    if not isinstance(calls, list):
+        return {"error": "'calls' must be a list"}
+    if len(calls) > settings.MCP_BATCH_MAX_SIZE:
+        return {"error": f"Batch too large: {len(calls)} calls (max {settings.MCP_BATCH_MAX_SIZE})"}
+
+    semaphore = asyncio.Semaphore(max(1, settings.TOOL_CALL_CONCURRENCY))
+
+    async def run(call) -> Dict:
+        if not isinstance(call, dict):
+            return {"error": "Each call must be an object with 'method' and 'params'"}
+        method = call.get("method")
+
+        async def queued() -> Dict:
+            async with semaphore:
+                return await dispatch(method, call.get("params", {}))
+
+        # The timeout covers the wait for a slot too, so the whole batch answers
+        # within TOOL_CALL_TIMEOUT and inside the client's deadline
+        try:
+            return await asyncio.wait_for(queued(), timeout=settings.TOOL_CALL_TIMEOUT)
+        except asyncio.TimeoutError:
+            return {"error": f"{method} timed out"}
+
+    results = await asyncio.gather(*(run(call) for call in calls))
+    return {"results": list(results)}
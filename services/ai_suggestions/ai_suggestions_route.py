@@ -33,7 +33,7 @@ async def chat(
 # Keep all other routes exactly as they were — they are perfect
 @router.get("/history", response_model=ConversationHistory)
 async def get_history(session_id: str = Query(default="default")):
-    history = chatbot.get_conversation_history(session_id)
+    history = await chatbot.get_conversation_history(session_id)
     user_history = history[1:] if len(history) > 1 else []
     return ConversationHistory(
         session_id=session_id,
@@ -44,7 +44,7 @@ async def get_history(session_id: str = Query(default="default")):
 
 @router.post("/clear")
 async def clear_history(session_id: str = Query(default="default")):
-    chatbot.clear_history(session_id)
+    await chatbot.clear_history(session_id)
     return {"message": f"History cleared for {session_id}"}
 
 @router.get("/health", response_model=HealthCheck)
@@ -1,21 +1,153 @@
 import httpx
 import json
-from typing import List, Dict, Optional, Tuple
+import asyncio
+import functools
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from datetime import datetime
 from Core.config import settings
 from services.chat.chatbot_schema import (
     ChatResponse, WeatherData, ForecastData, ForecastItem
 )
-from utils.llm_service import LLMService
+from services.chat.session_store import SessionStore, create_session_store
+from services.chat.response_cache import ResponseCache
+from utils.llm_service import LLM_ERROR_REPLY, LLMService
+from utils.intent_router import IntentRouter, RoutedIntent
 from utils.prompts import SYSTEM_PROMPT
-from vectordb.config import vector_store
+from utils.response_templates import is_simple_weather_question, render_tool_result
+from vectordb.config import vector_store_loader, vectordb_config
+from vectordb.ingest import VectorIngestQueue
+
+MAX_HISTORY_MESSAGES = 10  # dialogue turns kept per session, the system prompt comes on top
+FORECAST_DISPLAY_ERROR = "I received the forecast but had trouble displaying it properly."
+
+
+class PreparedTurn:
+    """Where a turn stands after the shared preamble: a finished reply, routed tool calls, or LLM messages"""
+
+    def __init__(
+        self,
+        reply: Optional[str] = None,
+        tool_calls: Optional[List] = None,
+        messages: Optional[List[Dict]] = None,
+        first_turn: bool = False,
+    ):
+        self.reply = reply
+        self.tool_calls = tool_calls
+        self.messages = messages
+        self.first_turn = first_turn
+
 
 class WeatherChatbot:
-    def __init__(self):
+    def __init__(self, session_store: Optional[SessionStore] = None):
         self.mcp_url = f"http://{settings.MCP_SERVER_HOST}:{settings.MCP_SERVER_PORT}"
         self.llm_service = LLMService()
-        self.conversation_history: Dict[str, List[Dict]] = {}
-        self.vector_store = vector_store
+        self.conversation_history: SessionStore = session_store or create_session_store()
+        self.vector_store_loader = vector_store_loader
+        self.ingest_queue = VectorIngestQueue(
+            vector_store_loader.wait,
+            batch_size=vectordb_config.ingest_batch_size,
+            flush_interval=vectordb_config.ingest_flush_interval,
+            max_queue=vectordb_config.ingest_queue_size,
+            housekeeping_interval=vectordb_config.housekeeping_interval,
+        ) if vector_store_loader.enabled else None
+        self.intent_router = IntentRouter() if settings.INTENT_ROUTER_ENABLED else None
+        self.response_cache = ResponseCache(
+            encode=self._embed_for_cache,
+            max_size=settings.RESPONSE_CACHE_MAX_SIZE,
+            ttl=settings.RESPONSE_CACHE_TTL,
+            similarity=settings.RESPONSE_CACHE_SIMILARITY,
+            max_words=settings.RESPONSE_CACHE_MAX_WORDS,
+        ) if settings.RESPONSE_CACHE_ENABLED else None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._in_process_service = None
+
+    def _build_client(self) -> httpx.AsyncClient:
+        """One keep-alive client for every call to the MCP server"""
+        if settings.MCP_IN_PROCESS:
+            # Same process: route requests straight into the MCP ASGI app, no sockets involved
+            from mcp_server import app as mcp_app, weather_service
+            self._in_process_service = weather_service
+            return httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=mcp_app),
+                base_url="http://mcp-server"
+            )
+        limits = httpx.Limits(
+            max_connections=settings.MCP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.MCP_CLIENT_MAX_KEEPALIVE,
+            keepalive_expiry=settings.MCP_CLIENT_KEEPALIVE_EXPIRY,
+        )
+        return httpx.AsyncClient(base_url=self.mcp_url, limits=limits)
+
+    async def start(self):
+        """Create the MCP client (called from the FastAPI lifespan)"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        if self._in_process_service is not None:
+            # No MCP lifespan in-process: the hot-city refresher starts with the chatbot instead
+            self._in_process_service.start_warmer()
+        if self.ingest_queue:
+            await self.ingest_queue.start()
+        if vectordb_config.warmup_on_startup:
+            # Model + index load in the background, requests are served meanwhile
+            self.vector_store_loader.start()
+
+    @property
+    def vector_store(self):
+        """The vector store once it has finished warming up, else None"""
+        return self.vector_store_loader.get()
+
+    def _embed_for_cache(self, texts: List[str]):
+        """Response cache embeddings come from the vector store's model (None until it is ready)"""
+        store = self.vector_store
+        return store.embed(texts) if store is not None else None
+
+    async def record_turn(self, session_id: str, message: str, reply: str):
+        """History for a turn answered without the LLM"""
+        await self.add_to_history(session_id, "user", message)
+        await self.add_to_history(session_id, "assistant", reply)
+
+    def route_message(self, message: str) -> Optional[RoutedIntent]:
+        """Local shortcut for obvious messages (canned reply or direct tool call), None -> LLM"""
+        if not self.intent_router:
+            return None
+        return self.intent_router.route(message)
+
+    async def is_first_turn(self, session_id: str) -> bool:
+        """No assistant reply yet in this session (response cache entries are only valid then)"""
+        history = await self.conversation_history.get(session_id) or []
+        return not any(turn["role"] == "assistant" for turn in history)
+
+    async def cached_reply(self, message: str, session_id: str, first_turn: bool) -> Optional[str]:
+        """First-turn reply from the response cache, recorded in history like a normal turn; None on miss"""
+        if not self.response_cache or not first_turn:
+            return None
+        reply = await self.response_cache.lookup(message)
+        if reply is not None:
+            await self.record_turn(session_id, message, reply)
+        return reply
+
+    async def remember_reply(self, message: str, reply: str, first_turn: bool):
+        """Cache a tool-free first-turn reply (never the LLM error fallback)"""
+        if self.response_cache and first_turn and reply != LLM_ERROR_REPLY:
+            await self.response_cache.store(message, reply)
+
+    async def close(self):
+        """Close the MCP client and flush pending vector writes (called from the FastAPI lifespan)"""
+        if self.ingest_queue:
+            await self.ingest_queue.stop()
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        if self._in_process_service is not None:
+            # The in-process MCP app never runs its own lifespan, so close its weather client here
+            await self._in_process_service.close()
+            self._in_process_service = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
 
     def decode_tool_args(self, raw):
         if not raw:
@@ -37,14 +169,26 @@ class WeatherChatbot:
 
     async def call_mcp_server(self, method: str, params: dict) -> dict:
         """Call the MCP server to execute tools"""
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.mcp_url}/mcp/invoke",
-                json={"method": method, "params": params},
-                timeout=10.0
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self.client.post(
+            "/mcp/invoke",
+            json={"method": method, "params": params},
+            timeout=10.0
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def call_mcp_server_batch(self, calls: List[Tuple[str, dict]]) -> List[dict]:
+        """Call the MCP server once for several tools, responses keep the request order"""
+        response = await self.client.post(
+            "/mcp/invoke_batch",
+            json={"calls": [{"method": method, "params": params} for method, params in calls]},
+            timeout=settings.TOOL_CALL_TIMEOUT + 5.0
+        )
+        response.raise_for_status()
+        data = response.json()
+        if data.get("error"):
+            raise RuntimeError(data["error"])
+        return data["results"]
 
     async def execute_tool_call(self, tool_name: str, arguments: dict) -> dict:
         """Execute a tool call via MCP server"""
@@ -56,42 +200,218 @@ class WeatherChatbot:
         except Exception as e:
             return {"error": str(e)}
 
-    def get_conversation_history(self, session_id: str = "default") -> List[Dict]:
-        """Get conversation history for a session"""
-        if session_id not in self.conversation_history:
-            self.conversation_history[session_id] = [
-                {"role": "system", "content": SYSTEM_PROMPT}
+    async def execute_tool_calls(self, tool_calls: List) -> List[Dict]:
+        """Run all tool calls of one turn concurrently, results keep the request order"""
+        if len(tool_calls) > 1:
+            decoded = [(tc.name, self.decode_tool_args(tc.arguments)) for tc in tool_calls]
+            try:
+                responses = await self.call_mcp_server_batch(decoded)
+                return [
+                    {
+                        "tool": name,
+                        "arguments": args,
+                        "result": {"error": resp["error"]} if resp.get("error") else resp["result"]["data"]
+                    }
+                    for (name, args), resp in zip(decoded, responses)
+                ]
+            except Exception as e:
+                # Only an older MCP server without /mcp/invoke_batch gets one request per call. Anything
+                # else (timeout, 5xx) would just run every tool a second time, so it fails the whole turn
+                if not (isinstance(e, httpx.HTTPStatusError) and e.response.status_code in (404, 405)):
+                    error = "timed out" if isinstance(e, httpx.TimeoutException) else f"failed: {e}"
+                    return [
+                        {"tool": name, "arguments": args, "result": {"error": f"{name} {error}"}}
+                        for name, args in decoded
+                    ]
+
+        semaphore = asyncio.Semaphore(max(1, settings.TOOL_CALL_CONCURRENCY))
+
+        async def run(tool_call) -> Dict:
+            args = self.decode_tool_args(tool_call.arguments)
+            async with semaphore:
+                try:
+                    result = await asyncio.wait_for(
+                        self.execute_tool_call(tool_call.name, args),
+                        timeout=settings.TOOL_CALL_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    result = {"error": f"{tool_call.name} timed out"}
+            return {"tool": tool_call.name, "arguments": args, "result": result}
+
+        return list(await asyncio.gather(*(run(tc) for tc in tool_calls)))
+
+    def parse_weather_data(self, result_data: dict) -> Optional[WeatherData]:
+        try:
+            return WeatherData(**result_data, timestamp=datetime.now())
+        except Exception as e:
+            print("WeatherData parsing error:", e)
+            return None
+
+    def parse_forecast_data(self, result_data: dict) -> Optional[ForecastData]:
+        if "forecasts" not in result_data:
+            return None
+        try:
+            forecasts_list = [
+                ForecastItem(
+                    date=item["date"],
+                    temp_min=item["temp_min"],
+                    temp_max=item["temp_max"],
+                    description=item["description"],
+                    sunrise=item.get("sunrise", "N/A"),
+                    sunset=item.get("sunset", "N/A"),
+                    temp_mean=item.get("temp_mean"),
+                    precipitation_probability=item.get("precipitation_probability", 0),
+                    precipitation_mm=item.get("precipitation_mm", 0.0),
+                    wind_max=item.get("wind_max", 0.0),
+                    humidity=item.get("humidity"),
+                )
+                for item in result_data["forecasts"]
             ]
-        return self.conversation_history[session_id]
+            return ForecastData(
+                city=result_data["city"],
+                country=result_data["country"],
+                forecasts=forecasts_list
+            )
+        except Exception as e:
+            print("ForecastData parsing error:", e)
+            return None
+
+    async def get_conversation_history(self, session_id: str = "default") -> List[Dict]:
+        """Get conversation history for a session (system prompt first)"""
+        history = await self.conversation_history.get(session_id) or []
+        # The store only keeps the dialogue turns; sessions saved with the prompt keep it until trimmed
+        if not history or history[0]["role"] != "system":
+            history = [{"role": "system", "content": SYSTEM_PROMPT}] + history
+        return history
 
-    def add_to_history(self, session_id: str, role: str, content: str):
+    async def add_to_history(self, session_id: str, role: str, content: str):
         """Add message to conversation history"""
-        history = self.get_conversation_history(session_id)
-        history.append({"role": role, "content": content})
-        if self.vector_store and role == "user":
-            self.vector_store.add_documents(
-                [content],
-                [{"session_id": session_id, "timestamp": datetime.now().isoformat(), "role": role}]
+        if self.ingest_queue and role == "user":
+            # Embedding + index write happen on the ingest worker, not here
+            self.ingest_queue.submit(
+                content,
+                {"session_id": session_id, "timestamp": datetime.now().isoformat(), "role": role}
             )
-        if len(history) > 11:
-            self.conversation_history[session_id] = [history[0]] + history[-10:]
+        await self.conversation_history.append(session_id, {"role": role, "content": content}, MAX_HISTORY_MESSAGES)
 
-    def clear_history(self, session_id: str = "default"):
-        """Clear conversation history for a session"""
-        if session_id in self.conversation_history:
-            del self.conversation_history[session_id]
+    async def clear_history(self, session_id: str = "default"):
+        """Clear conversation history for a session, and its stored vectors"""
+        await self.conversation_history.delete(session_id)
+        if self.ingest_queue:
+            # Queued behind the session's pending messages, so none of them survive the purge
+            await self.ingest_queue.purge_session(session_id)
 
-    async def get_similar_conversations(self, query: str, k: int = 3) -> List[str]:
-        """Get similar past conversations using vector search"""
-        if not self.vector_store:
+    async def get_similar_conversations(self, query: str, session_id: Optional[str] = None, k: int = 3) -> List[str]:
+        """Get similar past conversations using vector search (scoped to one session when given)"""
+        store = self.vector_store
+        if store is None:
+            # Disabled or still warming up: answer without vector context
             return []
         try:
-            results = self.vector_store.search(query, k=k)
+            # encode() is CPU-bound, keep it off the event loop
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(
+                None, functools.partial(store.search, query, k, session_id=session_id)
+            )
             return [doc for doc, score, meta in results if score < 1.5]
         except Exception as e:
             print(f"Vector search error: {e}")
             return []
 
+    async def build_messages(self, message: str, session_id: str, use_context: bool) -> List[Dict]:
+        """Record the user message and build the LLM prompt (history + optional vector context)"""
+        # Get similar past conversations for context (if enabled)
+        context_messages = []
+        if use_context and self.vector_store:
+            similar_convs = await self.get_similar_conversations(message, session_id=session_id)
+            if similar_convs:
+                context_messages = [
+                    {
+                        "role": "system",
+                        "content": f"Similar past queries: {', '.join(similar_convs[:2])}"
+                    }
+                ]
+
+        # Add user message to history
+        await self.add_to_history(session_id, "user", message)
+
+        # Get conversation history
+        messages = await self.get_conversation_history(session_id)
+
+        # Add context if available
+        if context_messages:
+            messages = messages[:1] + context_messages + messages[1:]
+        return messages
+
+    def tool_error_text(self, tool_results: List[Dict]) -> Optional[str]:
+        """Apology text when every tool call failed, otherwise None"""
+        if any("error" not in r["result"] for r in tool_results):
+            return None
+        error_message = tool_results[0]["result"]["error"]
+        return (
+            f"I'm sorry, I couldn't fetch the weather data: {error_message}. "
+            "Please check the city name and try again."
+        )
+
+    def tool_payload(self, tool_results: List[Dict]):
+        """Data handed to the formatting pass (failed calls included so the LLM can mention them)"""
+        if len(tool_results) == 1:
+            return tool_results[0]["result"]
+        return [{"tool": r["tool"], **r["result"]} for r in tool_results]
+
+    def template_response(self, tool_results: List[Dict], message: str) -> Optional[str]:
+        """Local template answer for simple single-city turns, None when the LLM should format it"""
+        mode = settings.WEATHER_RESPONSE_MODE.lower()
+        if mode == "llm" or len(tool_results) != 1:
+            return None
+        if mode == "auto" and not is_simple_weather_question(message):
+            return None
+        return render_tool_result(tool_results[0]["tool"], tool_results[0]["result"])
+
+    def finish_tool_response(self, tool_results: List[Dict], response_text: str) -> Tuple[
+        str, Optional[WeatherData], Optional[ForecastData]
+    ]:
+        """Structured data for the response, and the fallback text when a lone forecast can't be displayed"""
+        weather_data, forecast_data = self.extract_structured_data(tool_results)
+        only = tool_results[0] if len(tool_results) == 1 else None
+        if only and only["tool"] == "get_forecast" and "error" not in only["result"] and forecast_data is None:
+            response_text = FORECAST_DISPLAY_ERROR
+        return response_text, weather_data, forecast_data
+
+    async def prepare_turn(self, message: str, session_id: str, use_context: bool) -> PreparedTurn:
+        """Shared start of process_message and process_message_stream"""
+        routed = self.route_message(message)
+        if routed and routed.reply:
+            await self.record_turn(session_id, message, routed.reply)
+            return PreparedTurn(reply=routed.reply)
+
+        if routed and routed.tool_calls:
+            # Explicit weather request: straight to the tool, no first LLM round trip
+            await self.add_to_history(session_id, "user", message)
+            return PreparedTurn(tool_calls=routed.tool_calls)
+
+        # Read before this turn lands in history; only the response cache needs it
+        first_turn = self.response_cache is not None and await self.is_first_turn(session_id)
+        cached = await self.cached_reply(message, session_id, first_turn)
+        if cached is not None:
+            return PreparedTurn(reply=cached)
+
+        messages = await self.build_messages(message, session_id, use_context)
+        return PreparedTurn(messages=messages, first_turn=first_turn)
+
+    def extract_structured_data(self, tool_results: List[Dict]) -> Tuple[Optional[WeatherData], Optional[ForecastData]]:
+        """First successful weather and forecast result of the turn"""
+        weather_data = None
+        forecast_data = None
+        for r in tool_results:
+            if "error" in r["result"]:
+                continue
+            if r["tool"] == "get_weather" and weather_data is None:
+                weather_data = self.parse_weather_data(r["result"])
+            elif r["tool"] == "get_forecast" and forecast_data is None:
+                forecast_data = self.parse_forecast_data(r["result"])
+        return weather_data, forecast_data
+
     async def process_message(
         self,
         message: str,
@@ -100,122 +420,55 @@ class WeatherChatbot:
     ) -> ChatResponse:
         """Process user message using LLM with tool calling"""
         try:
-            # Get similar past conversations for context (if enabled)
-            context_messages = []
-            if use_context and self.vector_store:
-                similar_convs = await self.get_similar_conversations(message)
-                if similar_convs:
-                    context_messages = [
-                        {
-                            "role": "system",
-                            "content": f"Similar past queries: {', '.join(similar_convs[:2])}"
-                        }
-                    ]
+            turn = await self.prepare_turn(message, session_id, use_context)
+            if turn.reply is not None:
+                return ChatResponse(response=turn.reply, session_id=session_id)
 
-            # Add user message to history
-            self.add_to_history(session_id, "user", message)
-
-            # Get conversation history
-            messages = self.get_conversation_history(session_id)
-
-            # Add context if available
-            if context_messages:
-                messages = messages[:1] + context_messages + messages[1:]
-
-            # Get LLM response with potential tool calls
-            llm_response, tool_calls = await self.llm_service.get_completion(messages)
+            if turn.tool_calls:
+                llm_response, tool_calls = None, turn.tool_calls
+            else:
+                # Get LLM response with potential tool calls
+                llm_response, tool_calls = await self.llm_service.get_completion(turn.messages)
 
             # If LLM wants to use tools
             if tool_calls:
-                tool_results = []
-                tool_names = []
-
-                for tool_call in tool_calls:
-                    tool_names.append(tool_call.name)
-                    raw_args = tool_call.arguments
-                    args = self.decode_tool_args(raw_args)
-                    result = await self.execute_tool_call(
-                        tool_call.name,
-                        args
-                    )
-                    tool_results.append({
-                        "tool": tool_call.name,
-                        "result": result
-                    })
-
-                # Format the tool results into a natural response
-                if tool_results:
-                    # Check if there was an error
-                    if "error" in tool_results[0]["result"]:
-                        error_message = tool_results[0]["result"]["error"]
-                        response_text = (
-                            f"I'm sorry, I couldn't fetch the weather data: {error_message}. "
-                            "Please check the city name and try again."
-                        )
-                        self.add_to_history(session_id, "assistant", response_text)
-                        return ChatResponse(
-                            response=response_text,
-                            tool_calls=tool_names,
-                            session_id=session_id
-                        )
-
-                    # Format successful tool response
-                    formatted_response = await self.llm_service.format_weather_response(
-                        tool_results[0]["result"],
-                        message
-                    )
-                    self.add_to_history(session_id, "assistant", formatted_response)
-
-                    # Extract weather/forecast data
-                    weather_data = None
-                    forecast_data = None
-                    result_data = tool_results[0]["result"]
-
-                    if tool_results[0]["tool"] == "get_weather":
-                        if isinstance(result_data, dict) and "error" not in result_data:
-                            try:
-                                weather_data = WeatherData(
-                                    **result_data,
-                                    timestamp=datetime.now()
-                                )
-                            except Exception as e:
-                                print("WeatherData parsing error:", e)
-                                weather_data = None
-
-                    elif tool_results[0]["tool"] == "get_forecast":
-                        if isinstance(result_data, dict) and "error" not in result_data and "forecasts" in result_data:
-                            try:
-                                forecasts_list = [
-                                    ForecastItem(
-                                        date=item["date"],
-                                        temp_min=item["temp_min"],
-                                        temp_max=item["temp_max"],
-                                        description=item["description"]
-                                    )
-                                    for item in result_data["forecasts"]
-                                ]
-                                forecast_data = ForecastData(
-                                    city=result_data["city"],
-                                    country=result_data["country"],
-                                    forecasts=forecasts_list
-                                )
-                            except Exception as e:
-                                print("ForecastData parsing error:", e)
-                                forecast_data = None
-                                formatted_response = "I received the forecast but had trouble displaying it properly."
-                        else:
-                            formatted_response = "Sorry, I couldn't retrieve the weather forecast right now."
+                tool_names = [tool_call.name for tool_call in tool_calls]
+                tool_results = await self.execute_tool_calls(tool_calls)
 
+                # Every tool call failed
+                error_text = self.tool_error_text(tool_results)
+                if error_text:
+                    await self.add_to_history(session_id, "assistant", error_text)
                     return ChatResponse(
-                        response=formatted_response,
-                        weather_data=weather_data,
-                        forecast_data=forecast_data,
+                        response=error_text,
                         tool_calls=tool_names,
                         session_id=session_id
                     )
 
+                # Format successful tool responses (template fast path, else second LLM pass)
+                formatted_response = self.template_response(tool_results, message)
+                if formatted_response is None:
+                    formatted_response = await self.llm_service.format_weather_response(
+                        self.tool_payload(tool_results),
+                        message
+                    )
+                await self.add_to_history(session_id, "assistant", formatted_response)
+
+                formatted_response, weather_data, forecast_data = self.finish_tool_response(
+                    tool_results, formatted_response
+                )
+
+                return ChatResponse(
+                    response=formatted_response,
+                    weather_data=weather_data,
+                    forecast_data=forecast_data,
+                    tool_calls=tool_names,
+                    session_id=session_id
+                )
+
             # No tools called, just conversational response
-            self.add_to_history(session_id, "assistant", llm_response)
+            await self.add_to_history(session_id, "assistant", llm_response)
+            await self.remember_reply(message, llm_response, turn.first_turn)
             return ChatResponse(
                 response=llm_response,
                 session_id=session_id
@@ -228,21 +481,116 @@ class WeatherChatbot:
                 session_id=session_id
             )
 
+    async def process_message_stream(
+        self,
+        message: str,
+        session_id: str = "default",
+        use_context: bool = True
+    ) -> AsyncIterator[Dict]:
+        """
+        Same flow as process_message, but yields events as the LLM generates them:
+        {"type": "token", "content": ...}, {"type": "tool_calls", "tools": [...]},
+        and finally {"type": "done", "data": <ChatResponse>}.
+        """
+        try:
+            turn = await self.prepare_turn(message, session_id, use_context)
+            if turn.reply is not None:
+                yield {"type": "token", "content": turn.reply}
+                yield {
+                    "type": "done",
+                    "data": ChatResponse(response=turn.reply, session_id=session_id).model_dump(mode="json")
+                }
+                return
+
+            chunks = []
+            tool_calls = turn.tool_calls
+            if not tool_calls:
+                async for kind, payload in self.llm_service.stream_completion(turn.messages):
+                    if kind == "token":
+                        chunks.append(payload)
+                        yield {"type": "token", "content": payload}
+                    elif kind == "tool_calls":
+                        tool_calls = payload
+
+            tool_names = None
+            weather_data = None
+            forecast_data = None
+
+            if tool_calls:
+                tool_names = [tool_call.name for tool_call in tool_calls]
+                yield {"type": "tool_calls", "tools": tool_names}
+                tool_results = await self.execute_tool_calls(tool_calls)
+
+                chunks = []
+                # Error text or template answer need no second LLM pass
+                local_text = self.tool_error_text(tool_results) or self.template_response(tool_results, message)
+                if local_text:
+                    chunks.append(local_text)
+                    yield {"type": "token", "content": local_text}
+                else:
+                    # Second pass: stream the formatted answer as well
+                    async for token in self.llm_service.stream_weather_response(
+                        self.tool_payload(tool_results),
+                        message
+                    ):
+                        chunks.append(token)
+                        yield {"type": "token", "content": token}
+
+            response_text = "".join(chunks)
+            await self.add_to_history(session_id, "assistant", response_text)
+            if tool_calls:
+                response_text, weather_data, forecast_data = self.finish_tool_response(tool_results, response_text)
+            else:
+                await self.remember_reply(message, response_text, turn.first_turn)
+            yield {
+                "type": "done",
+                "data": ChatResponse(
+                    response=response_text,
+                    weather_data=weather_data,
+                    forecast_data=forecast_data,
+                    tool_calls=tool_names,
+                    session_id=session_id
+                ).model_dump(mode="json")
+            }
+
+        except Exception as e:
+            error_msg = f"I apologize, but I encountered an error: {str(e)}. Please try again."
+            yield {"type": "error", "content": error_msg}
+
     async def check_mcp_health(self) -> bool:
         """Check if MCP server is healthy"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.mcp_url}/health",
-                    timeout=5.0
-                )
-                return response.status_code == 200
+            response = await self.client.get("/health", timeout=5.0)
+            return response.status_code == 200
         except:
             return False
 
+    def get_session_stats(self) -> dict:
+        """Get session store statistics"""
+        return self.conversation_history.get_stats()
+
+    def get_llm_stats(self) -> dict:
+        """Get Groq rate limit / retry / circuit breaker counters"""
+        return self.llm_service.get_stats()
+
+    def get_router_stats(self) -> dict:
+        """Get intent router counters"""
+        if not self.intent_router:
+            return {"enabled": False}
+        return self.intent_router.get_stats()
+
+    def get_response_cache_stats(self) -> dict:
+        """Get response cache statistics"""
+        if not self.response_cache:
+            return {"enabled": False}
+        return self.response_cache.get_stats()
+
     def get_vector_stats(self) -> dict:
         """Get vector store statistics"""
-        if self.vector_store:
-            return self.vector_store.get_stats()
-        return {"enabled": False}
+        if not self.vector_store_loader.enabled:
+            return {"enabled": False}
+        stats = {"warmup": self.vector_store_loader.get_status(), "ingest": self.ingest_queue.get_stats()}
+        if self.vector_store_loader.ready:
+            stats.update(self.vector_store_loader.store.get_stats())
+        return stats
     
\ No newline at end of file
@@ -1,9 +1,12 @@
 # services/chat/chatbot_route.py
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from services.chat.chatbot_schema import ChatMessage, ChatResponse, ConversationHistory, HealthCheck
 from services.chat.chatbot import WeatherChatbot
 from Core.config import settings
+from utils.redis_client import ping_redis
 from datetime import datetime
+import json
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 chatbot = WeatherChatbot()
@@ -27,10 +30,35 @@ async def chat(
     return response
 
 
+@router.post("/stream")
+async def chat_stream(
+    message: ChatMessage,
+    session_id: str = Query(default="default", description="Session ID"),
+    use_context: bool = Query(default=True, description="Use vector context")
+):
+    """Same as POST /chat/, but streams tokens as Server-Sent Events ("data: {json}" per event)"""
+    if not message.message.strip():
+        raise HTTPException(status_code=400, detail="Message cannot be empty")
+
+    async def event_stream():
+        async for event in chatbot.process_message_stream(
+            message=message.message,
+            session_id=session_id,
+            use_context=use_context
+        ):
+            yield f"data: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 # Rest of your routes (keep exactly as they are — they are perfect)
 @router.get("/history", response_model=ConversationHistory)
 async def get_history(session_id: str = Query(default="default")):
-    history = chatbot.get_conversation_history(session_id)
+    history = await chatbot.get_conversation_history(session_id)
     user_history = history[1:] if len(history) > 1 else []
     return ConversationHistory(
         session_id=session_id,
@@ -41,15 +69,26 @@ async def get_history(session_id: str = Query(default="default")):
 
 @router.post("/clear")
 async def clear_history(session_id: str = Query(default="default")):
-    chatbot.clear_history(session_id)
+    await chatbot.clear_history(session_id)
     return {"message": f"History cleared for session: {session_id}"}
 
+@router.get("/stats")
+async def stats():
+    return {
+        "sessions": chatbot.get_session_stats(),
+        "vector_store": chatbot.get_vector_stats(),
+        "response_cache": chatbot.get_response_cache_stats(),
+        "intent_router": chatbot.get_router_stats(),
+        "llm": chatbot.get_llm_stats(),
+    }
+
 @router.get("/health", response_model=HealthCheck)
 async def health_check():
+    mcp_healthy = await chatbot.check_mcp_health()
     return HealthCheck(
         status="healthy",
         fastapi="healthy",
-        mcp_server="healthy",
-        llm_configured=bool(settings.GEMINI_API_KEY),
-        redis_connected=True
+        mcp_server="healthy" if mcp_healthy else "unreachable",
+        llm_configured=bool(settings.GROQ_API_KEY),
+        redis_connected=await ping_redis()
     )
\ No newline at end of file
@@ -30,6 +30,11 @@ class ForecastItem(BaseModel):
     #new add fields
     sunrise:str="N/A"
     sunset:str="N/A"
+    temp_mean: Optional[float] = None
+    precipitation_probability: int = 0  # percent, highest 3-hour chance of the day
+    precipitation_mm: float = 0.0  # rain + snow total
+    wind_max: float = 0.0
+    humidity: Optional[int] = None
     
     
 
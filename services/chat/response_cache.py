@@ -0,0 +1,162 @@
+import re
+import time
+import asyncio
+import faiss
+import numpy as np
+from typing import Callable, Dict, List, Optional
+from utils.cache import TTLCache
+
+# Follow-ups whose answer depends on earlier turns ("what about tomorrow?", "and there?", "yes")
+CONTEXTUAL_PATTERN = re.compile(
+    r"\b(it|that|this|there|those|these|them|he|she|they|again|also|too|else|more|"
+    r"tomorrow|yesterday|earlier|before|previous|last|same|what about|how about|and|"
+    r"yes|yeah|yep|yup|no|nope|nah|ok|okay|sure|fine|go ahead|please do)\b",
+    re.IGNORECASE,
+)
+# Anything weather-related goes to the LLM + tools, never to a cached small-talk reply
+WEATHER_PATTERN = re.compile(
+    r"\b(weather|forecast|temperature|temp|rain|raining|snow|sunny|cloudy|wind|windy|humid|"
+    r"humidity|storm|hot|cold|warm|degrees|celsius|fahrenheit|umbrella)\b",
+    re.IGNORECASE,
+)
+_NON_WORD = re.compile(r"[^\w\s]")
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, punctuation stripped, whitespace collapsed: "Hi!!" and "hi" share a key"""
+    return " ".join(_NON_WORD.sub(" ", message.lower()).split())
+
+
+class ResponseCache:
+    """
+    Cache of tool-free LLM replies (greetings, thanks, small talk).
+
+    Lookups try the exact normalized text first, then the nearest cached
+    message by embedding cosine similarity (a small flat inner-product scan,
+    same faiss machinery as the vector store). Only short, self-contained,
+    non-weather messages are looked up or stored; everything else bypasses.
+    The key is the message alone, so callers only use it on a session's
+    first turn, where no earlier reply can change the answer.
+    """
+
+    def __init__(
+        self,
+        encode: Optional[Callable[[List[str]], Optional[np.ndarray]]] = None,
+        max_size: int = 1000,
+        ttl: float = 3600.0,
+        similarity: float = 0.92,
+        max_words: int = 12,
+    ):
+        self.encode = encode  # returns None while no embedding model is available
+        self.exact = TTLCache(max_size=max_size, default_ttl=ttl)
+        self.max_size = max_size
+        self.ttl = ttl
+        self.similarity = similarity
+        self.max_words = max_words
+
+        # Semantic tier: fixed-size ring of normalized embeddings
+        self._vectors: Optional[np.ndarray] = None
+        self._replies: List[Optional[str]] = [None] * max_size
+        self._expires = np.zeros(max_size, dtype="float64")
+        self._filled = 0
+        self._next = 0
+
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.stored = 0
+
+    def cacheable(self, message: str) -> bool:
+        words = normalize_message(message).split()
+        if not words or len(words) > self.max_words:
+            return False
+        return CONTEXTUAL_PATTERN.search(message) is None and WEATHER_PATTERN.search(message) is None
+
+    async def _embed(self, text: str) -> Optional[np.ndarray]:
+        if self.encode is None or self.similarity <= 0:
+            return None
+        try:
+            # encode() is CPU-bound, keep it off the event loop
+            vectors = await asyncio.get_running_loop().run_in_executor(None, self.encode, [text])
+        except Exception as e:
+            print(f"Response cache embedding error: {e}")
+            return None
+        if vectors is None:
+            return None
+        vectors = np.ascontiguousarray(vectors, dtype="float32")
+        faiss.normalize_L2(vectors)
+        return vectors
+
+    async def lookup(self, message: str) -> Optional[str]:
+        """Cached reply for this message, or None (miss or bypass)"""
+        if not self.cacheable(message):
+            self.bypassed += 1
+            return None
+
+        key = normalize_message(message)
+        reply = self.exact.get(key)
+        if reply is not None:
+            self.exact_hits += 1
+            return reply
+
+        if self._filled:
+            query = await self._embed(key)
+            if query is not None:
+                scores, ids = faiss.knn(
+                    query, self._vectors[:self._filled], min(4, self._filled), faiss.METRIC_INNER_PRODUCT
+                )
+                now = time.monotonic()
+                for score, i in zip(scores[0], ids[0]):
+                    if i >= 0 and score >= self.similarity and self._expires[i] > now:
+                        self.semantic_hits += 1
+                        return self._replies[i]
+
+        self.misses += 1
+        return None
+
+    async def store(self, message: str, reply: str):
+        if not reply or not self.cacheable(message):
+            return
+        key = normalize_message(message)
+        if self.exact.get(key) is not None:
+            return
+        self.exact.set(key, reply)
+        self.stored += 1
+
+        vector = await self._embed(key)
+        if vector is None:
+            return
+        if self._vectors is None:
+            self._vectors = np.zeros((self.max_size, vector.shape[1]), dtype="float32")
+        # Overwrite the oldest slot once the ring is full
+        slot = self._next
+        self._vectors[slot] = vector[0]
+        self._replies[slot] = reply
+        self._expires[slot] = time.monotonic() + self.ttl
+        self._next = (slot + 1) % self.max_size
+        self._filled = min(self._filled + 1, self.max_size)
+
+    def clear(self):
+        self.exact.clear()
+        self._vectors = None
+        self._replies = [None] * self.max_size
+        self._filled = 0
+        self._next = 0
+
+    def get_stats(self) -> Dict:
+        hits = self.exact_hits + self.semantic_hits
+        lookups = hits + self.misses
+        return {
+            "entries": len(self.exact),
+            "semantic_entries": self._filled,
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "similarity": self.similarity,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "stored": self.stored,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
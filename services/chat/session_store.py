@@ -0,0 +1,204 @@
+import sys
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from Core.config import settings
+from utils.redis_client import get_redis_client, redis_key
+
+
+class SessionStore:
+    """Backend interface for per-session conversation history"""
+
+    async def get(self, session_id: str) -> Optional[List[Dict]]:
+        raise NotImplementedError
+
+    async def set(self, session_id: str, history: List[Dict]):
+        raise NotImplementedError
+
+    async def append(self, session_id: str, message: Dict, max_messages: int):
+        """Add one message, keeping only the newest `max_messages`"""
+        history = await self.get(session_id) or []
+        history.append(message)
+        await self.set(session_id, history[-max_messages:])
+
+    async def delete(self, session_id: str):
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict:
+        return {"backend": type(self).__name__}
+
+
+class InMemorySessionStore(SessionStore):
+    """Plain dict, never evicts (the original behavior)"""
+
+    def __init__(self):
+        self.sessions: Dict[str, List[Dict]] = {}
+
+    async def get(self, session_id: str) -> Optional[List[Dict]]:
+        return self.sessions.get(session_id)
+
+    async def set(self, session_id: str, history: List[Dict]):
+        self.sessions[session_id] = history
+
+    async def delete(self, session_id: str):
+        self.sessions.pop(session_id, None)
+
+    def get_stats(self) -> Dict:
+        return {"backend": "memory", "sessions": len(self.sessions)}
+
+
+def estimate_history_bytes(history: List[Dict]) -> int:
+    """Rough memory footprint of one session's message list"""
+    size = sys.getsizeof(history)
+    for msg in history:
+        size += sys.getsizeof(msg)
+        for key, value in msg.items():
+            size += sys.getsizeof(key) + sys.getsizeof(value)
+    return size
+
+
+class BoundedSessionStore(SessionStore):
+    """
+    LRU-ordered session store with a session cap, an optional memory cap
+    and idle-TTL eviction. Least recently used sessions are evicted first.
+    """
+
+    def __init__(self, max_sessions: int = 10000, idle_ttl: float = 3600.0, max_bytes: int = 0):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.max_bytes = max_bytes  # 0 = no memory cap
+        self._sessions: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self._last_access: Dict[str, float] = {}
+        self._sizes: Dict[str, int] = {}
+        self.total_bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _remove(self, session_id: str):
+        self._sessions.pop(session_id, None)
+        self._last_access.pop(session_id, None)
+        self.total_bytes -= self._sizes.pop(session_id, 0)
+
+    def _is_expired(self, session_id: str, now: float) -> bool:
+        return self.idle_ttl > 0 and now - self._last_access[session_id] > self.idle_ttl
+
+    def _evict(self, now: float):
+        # LRU order == idle order, so expired sessions are always at the front
+        while self._sessions:
+            oldest = next(iter(self._sessions))
+            if self._is_expired(oldest, now):
+                self._remove(oldest)
+                self.expirations += 1
+            elif len(self._sessions) > self.max_sessions or (self.max_bytes and self.total_bytes > self.max_bytes):
+                self._remove(oldest)
+                self.evictions += 1
+            else:
+                break
+
+    async def get(self, session_id: str) -> Optional[List[Dict]]:
+        if session_id not in self._sessions:
+            return None
+        now = time.monotonic()
+        if self._is_expired(session_id, now):
+            self._remove(session_id)
+            self.expirations += 1
+            return None
+        self._sessions.move_to_end(session_id)
+        self._last_access[session_id] = now
+        return self._sessions[session_id]
+
+    async def set(self, session_id: str, history: List[Dict]):
+        now = time.monotonic()
+        size = estimate_history_bytes(history)
+        self.total_bytes += size - self._sizes.get(session_id, 0)
+        self._sizes[session_id] = size
+        self._sessions[session_id] = history
+        self._sessions.move_to_end(session_id)
+        self._last_access[session_id] = now
+        self._evict(now)
+
+    async def delete(self, session_id: str):
+        self._remove(session_id)
+
+    def get_stats(self) -> Dict:
+        return {
+            "backend": "bounded",
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "idle_ttl": self.idle_ttl,
+            "approx_bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Shared session store for multi-worker / multi-node deployments.
+    Each session is a Redis list of JSON messages with an idle TTL that
+    is refreshed on every read and write.
+    """
+
+    def __init__(self, client=None, idle_ttl: float = 3600.0):
+        self.client = client if client is not None else get_redis_client()
+        self.idle_ttl = int(idle_ttl)
+
+    def _key(self, session_id: str) -> str:
+        return redis_key("session", session_id)
+
+    async def get(self, session_id: str) -> Optional[List[Dict]]:
+        key = self._key(session_id)
+        # One round trip: read the list and refresh its idle TTL
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.lrange(key, 0, -1)
+            if self.idle_ttl > 0:
+                pipe.expire(key, self.idle_ttl)
+            results = await pipe.execute()
+        if not results[0]:
+            return None
+        return [json.loads(item) for item in results[0]]
+
+    async def set(self, session_id: str, history: List[Dict]):
+        key = self._key(session_id)
+        # Replace the whole list atomically in one round trip
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            if history:
+                pipe.rpush(key, *[json.dumps(msg) for msg in history])
+                if self.idle_ttl > 0:
+                    pipe.expire(key, self.idle_ttl)
+            await pipe.execute()
+
+    async def append(self, session_id: str, message: Dict, max_messages: int):
+        key = self._key(session_id)
+        # Push server-side: concurrent turns of one session (other workers) can't overwrite each other
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, json.dumps(message))
+            pipe.ltrim(key, -max_messages, -1)
+            if self.idle_ttl > 0:
+                pipe.expire(key, self.idle_ttl)
+            await pipe.execute()
+
+    async def delete(self, session_id: str):
+        await self.client.delete(self._key(session_id))
+
+    def get_stats(self) -> Dict:
+        return {"backend": "redis", "idle_ttl": self.idle_ttl}
+
+
+def create_session_store() -> SessionStore:
+    """Build the backend selected by SESSION_STORE_BACKEND"""
+    backend = settings.SESSION_STORE_BACKEND.lower()
+    if backend == "bounded":
+        return BoundedSessionStore(
+            max_sessions=settings.SESSION_MAX_SESSIONS,
+            idle_ttl=settings.SESSION_IDLE_TTL,
+            max_bytes=settings.SESSION_MAX_BYTES,
+        )
+    if backend == "redis":
+        return RedisSessionStore(idle_ttl=settings.SESSION_IDLE_TTL)
+    if backend != "memory":
+        print(f"Unknown SESSION_STORE_BACKEND '{backend}', using in-memory store")
+    return InMemorySessionStore()
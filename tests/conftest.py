@@ -0,0 +1,5 @@
+import os
+
+# Core.config requires the API keys at import time; no test calls the real APIs
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("OPENWEATHER_API_KEY", "test")
@@ -0,0 +1,14 @@
+from utils.gazetteer import get_gazetteer
+
+
+def test_close_spelling_is_suggested_not_resolved():
+    gazetteer = get_gazetteer()
+    # Georgetown (Guyana, ...) is not George Town, Malaysia: never query with the guess
+    assert gazetteer.resolve("Georgetown") is None
+    assert "George Town, MY" in [city.label for city in gazetteer.suggest("Georgetown")]
+
+
+def test_exact_names_resolve_regardless_of_case_and_spacing():
+    gazetteer = get_gazetteer()
+    assert gazetteer.resolve("george  town").label == "George Town, MY"
+    assert gazetteer.resolve("NEW YORK, us").label == gazetteer.resolve("New York").label
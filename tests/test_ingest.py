@@ -0,0 +1,27 @@
+import asyncio
+from vectordb.ingest import VectorIngestQueue
+
+
+class RecordingStore:
+    def __init__(self):
+        self.texts = []
+
+    def add_documents(self, texts, metadata_list):
+        self.texts.extend(texts)
+
+
+def test_queue_restarts_after_stop():
+    store = RecordingStore()
+    queue = VectorIngestQueue(lambda: store, flush_interval=0.01)
+
+    async def lifespan(text):
+        await queue.start()
+        queue.submit(text, {"session_id": "s"})
+        await queue.stop()
+
+    # Same queue object across two app lifespans (module-global chatbot, reloads, tests)
+    asyncio.run(lifespan("first"))
+    asyncio.run(lifespan("second"))
+
+    assert store.texts == ["first", "second"]
+    assert queue.get_stats()["failed"] == 0
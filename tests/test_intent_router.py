@@ -0,0 +1,22 @@
+from utils.intent_router import IntentRouter
+
+
+def route_call(message):
+    intent = IntentRouter().route(message)
+    assert intent is not None and intent.tool_calls
+    call = intent.tool_calls[0]
+    return call.name, call.arguments
+
+
+def test_forecast_keeps_requested_days():
+    assert route_call("3 day forecast for London") == ("get_forecast", {"city": "London", "days": 3})
+    assert route_call("what's the 2-day forecast for Paris?") == ("get_forecast", {"city": "Paris", "days": 2})
+
+
+def test_forecast_days_clamped_to_available_range():
+    assert route_call("10 day forecast for London")[1]["days"] == 5
+    assert route_call("0 day forecast for London")[1]["days"] == 1
+
+
+def test_plain_forecast_has_no_days():
+    assert route_call("forecast for London") == ("get_forecast", {"city": "London"})
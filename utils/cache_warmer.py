@@ -0,0 +1,137 @@
+# utils/cache_warmer.py
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+from utils.cache import TTLCache
+
+
+class CacheWarmer:
+    """
+    Keeps the most requested cache entries fresh.
+
+    Every lookup is recorded with a refresh callback; popularity is an
+    exponentially decayed hit count, so a city nobody asked about for a few
+    half-lives drops out. Every `interval` seconds the top-N keys whose
+    entries expire within `refresh_ahead` seconds (or already went stale)
+    are refreshed in the background, so their users always hit the cache.
+    """
+
+    def __init__(
+        self,
+        cache: TTLCache,
+        top_n: int = 20,
+        interval: float = 30.0,
+        refresh_ahead: float = 60.0,
+        half_life: float = 1800.0,
+        min_score: float = 1.5,
+        concurrency: int = 4,
+        max_tracked: int = 2000,
+    ):
+        self.cache = cache
+        self.top_n = top_n
+        self.interval = interval
+        self.refresh_ahead = refresh_ahead
+        self.half_life = half_life
+        self.min_score = min_score
+        self.concurrency = max(1, concurrency)
+        self.max_tracked = max(max_tracked, top_n)
+        # key -> [score, last_seen, refresh]
+        self._tracked: Dict[Hashable, list] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def _decayed(self, score: float, last_seen: float, now: float) -> float:
+        return score * 0.5 ** ((now - last_seen) / self.half_life)
+
+    def record(self, key: Hashable, refresh: Callable[[], Awaitable[Any]]):
+        """Count one request for `key`; `refresh` re-fetches it upstream and refills the cache"""
+        now = time.monotonic()
+        entry = self._tracked.get(key)
+        if entry is None:
+            self._tracked[key] = [1.0, now, refresh]
+            if len(self._tracked) > self.max_tracked:
+                self._prune(now)
+        else:
+            entry[0] = self._decayed(entry[0], entry[1], now) + 1.0
+            entry[1] = now
+            entry[2] = refresh
+
+    def _prune(self, now: float):
+        """Forget the coldest half of the tracked keys"""
+        ranked = sorted(self._tracked, key=lambda k: self._decayed(*self._tracked[k][:2], now))
+        for key in ranked[:len(ranked) // 2]:
+            del self._tracked[key]
+
+    def hot_keys(self) -> List[Hashable]:
+        now = time.monotonic()
+        scored = [(self._decayed(score, seen, now), key) for key, (score, seen, _) in self._tracked.items()]
+        scored = [pair for pair in scored if pair[0] >= self.min_score]
+        scored.sort(key=lambda pair: -pair[0])
+        return [key for _, key in scored[:self.top_n]]
+
+    # ======================================================
+    #   REFRESH LOOP
+    # ======================================================
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh_due()
+            except Exception as e:
+                print(f"Cache warmer error: {e}")
+
+    async def refresh_due(self) -> int:
+        """Refresh hot entries that are about to expire; returns how many were refreshed"""
+        self.runs += 1
+        now = time.monotonic()
+        due = []
+        for key in self.hot_keys():
+            entry = self.cache.peek(key)
+            # Missing entries (evicted, or the last fetch failed) refill on the next real request
+            if entry is not None and entry[0] - now <= self.refresh_ahead:
+                due.append((key, self._tracked[key][2]))
+        if not due:
+            return 0
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def refresh(key: Hashable, fetch: Callable[[], Awaitable[Any]]):
+            async with semaphore:
+                try:
+                    result = await fetch()
+                except Exception as e:
+                    result = {"error": str(e)}
+            if isinstance(result, dict) and "error" in result:
+                self.refresh_errors += 1
+                print(f"Cache warmer: refresh of {key} failed ({result['error']})")
+            else:
+                self.refreshes += 1
+
+        await asyncio.gather(*(refresh(key, fetch) for key, fetch in due))
+        return len(due)
+
+    def get_stats(self) -> Dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "tracked": len(self._tracked),
+            "hot": len(self.hot_keys()),
+            "top_n": self.top_n,
+            "runs": self.runs,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+        }
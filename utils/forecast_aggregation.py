@@ -0,0 +1,145 @@
+# utils/forecast_aggregation.py
+import numpy as np
+from datetime import datetime
+from typing import Dict, List, Optional
+
+SECONDS_PER_DAY = 86400
+STEP_SECONDS = 3 * 3600  # OpenWeather /forecast: one entry every 3 hours
+SUN_ZENITH_DEG = 90.833  # upper limb at the horizon, with atmospheric refraction
+
+
+def parse_forecast_list(items: List[Dict]) -> Dict[str, np.ndarray]:
+    """Walk the /forecast "list" once, into one array per field (sorted by time)"""
+    n = len(items)
+    dt = np.empty(n, dtype="int64")
+    temp, temp_min, temp_max = np.empty(n), np.empty(n), np.empty(n)
+    humidity, wind, pop, precip = np.empty(n), np.empty(n), np.empty(n), np.empty(n)
+    condition = np.empty(n, dtype="int64")
+    descriptions = []
+    for i, item in enumerate(items):
+        main = item.get("main", {})
+        dt[i] = item.get("dt", 0)
+        temp[i] = main.get("temp", 0.0)
+        temp_min[i] = main.get("temp_min", temp[i])
+        temp_max[i] = main.get("temp_max", temp[i])
+        humidity[i] = main.get("humidity", 0)
+        wind[i] = item.get("wind", {}).get("speed", 0.0)
+        pop[i] = item.get("pop", 0.0)
+        # Rain and snow volumes (mm) for the 3h step, either key may be missing
+        precip[i] = item.get("rain", {}).get("3h", 0.0) + item.get("snow", {}).get("3h", 0.0)
+        weather = (item.get("weather") or [{}])[0]
+        condition[i] = weather.get("id", 800)
+        descriptions.append(weather.get("description", ""))
+
+    order = np.argsort(dt, kind="stable")
+    columns = {
+        "dt": dt, "temp": temp, "temp_min": temp_min, "temp_max": temp_max,
+        "humidity": humidity, "wind": wind, "pop": pop, "precip": precip, "condition": condition,
+    }
+    columns = {name: values[order] for name, values in columns.items()}
+    columns["description"] = np.array(descriptions, dtype=object)[order]
+    return columns
+
+
+def sun_times(days: np.ndarray, lat: float, lon: float, timezone_offset: int):
+    """
+    Local sunrise / sunset (seconds after local midnight) for each local day
+    number (days since the epoch), NOAA general solar position formulas.
+    NaN where the sun does not rise or set that day (polar day / night).
+    """
+    dates = days.astype("datetime64[D]")
+    doy = (dates - dates.astype("datetime64[Y]")).astype("float64") + 1
+    gamma = 2 * np.pi / 365 * (doy - 1)  # fractional year at local noon
+    eqtime = 229.18 * (
+        0.000075 + 0.001868 * np.cos(gamma) - 0.032077 * np.sin(gamma)
+        - 0.014615 * np.cos(2 * gamma) - 0.040849 * np.sin(2 * gamma)
+    )
+    decl = (
+        0.006918 - 0.399912 * np.cos(gamma) + 0.070257 * np.sin(gamma)
+        - 0.006758 * np.cos(2 * gamma) + 0.000907 * np.sin(2 * gamma)
+        - 0.002697 * np.cos(3 * gamma) + 0.00148 * np.sin(3 * gamma)
+    )
+    phi = np.radians(lat)
+    cos_ha = np.cos(np.radians(SUN_ZENITH_DEG)) / (np.cos(phi) * np.cos(decl)) - np.tan(phi) * np.tan(decl)
+    with np.errstate(invalid="ignore"):
+        ha = np.degrees(np.arccos(cos_ha))  # NaN when |cos_ha| > 1
+    # Minutes after UTC midnight, shifted to the city's local clock
+    sunrise = (720 - 4 * (lon + ha) - eqtime) * 60 + timezone_offset
+    sunset = (720 - 4 * (lon - ha) - eqtime) * 60 + timezone_offset
+    return sunrise, sunset
+
+
+def _clock(seconds: float) -> str:
+    if np.isnan(seconds):
+        return "N/A"
+    minutes = int(round(seconds / 60)) % (24 * 60)
+    return datetime(2000, 1, 1, minutes // 60, minutes % 60).strftime("%I:%M %p")
+
+
+def aggregate_forecast(data: Dict, days: Optional[int] = None) -> List[Dict]:
+    """
+    Per-day summary of a /forecast response, every statistic computed per
+    column in one vectorized pass over the local-day groups: temperature
+    min/max/mean, max precipitation probability, precipitation total, max
+    wind, mean humidity, the condition that covers the most hours, and the
+    day's own sunrise/sunset (not the city's current one).
+    """
+    items = data.get("list") or []
+    if not items:
+        return []
+    city = data.get("city", {})
+    timezone_offset = city.get("timezone", 0)
+    cols = parse_forecast_list(items)
+
+    # Local calendar day of each entry; entries are time-sorted, so each day is one contiguous run
+    day = (cols["dt"] + timezone_offset) // SECONDS_PER_DAY
+    starts = np.flatnonzero(np.r_[True, day[1:] != day[:-1]])
+    if days is not None and len(starts) > days:
+        cut = starts[days]
+        cols = {name: values[:cut] for name, values in cols.items()}
+        day, starts = day[:cut], starts[:days]
+    counts = np.diff(np.r_[starts, len(day)])
+
+    temp_min = np.minimum.reduceat(cols["temp_min"], starts)
+    temp_max = np.maximum.reduceat(cols["temp_max"], starts)
+    temp_mean = np.add.reduceat(cols["temp"], starts) / counts
+    pop = np.maximum.reduceat(cols["pop"], starts)
+    precip = np.add.reduceat(cols["precip"], starts)
+    wind_max = np.maximum.reduceat(cols["wind"], starts)
+    humidity = np.add.reduceat(cols["humidity"], starts) / counts
+
+    # Dominant condition: hours each description covers within the day, weighted by step length
+    duration = np.r_[np.diff(cols["dt"]), STEP_SECONDS].clip(0, STEP_SECONDS).astype("float64")
+    labels, codes = np.unique(cols["description"].astype(str), return_inverse=True)
+    group = np.repeat(np.arange(len(starts)), counts)
+    weights = np.bincount(
+        group * len(labels) + codes, weights=duration, minlength=len(starts) * len(labels)
+    ).reshape(len(starts), len(labels))
+    # Equal hours: the more significant condition wins (OpenWeather ids: 2xx storm ... 800 clear)
+    severity = np.full(len(labels), np.inf)
+    np.minimum.at(severity, codes, cols["condition"])
+    dominant = labels[(weights - severity * 1e-9).argmax(axis=1)]
+
+    coord = city.get("coord") or {}
+    if "lat" in coord and "lon" in coord:
+        sunrise, sunset = sun_times(day[starts], coord["lat"], coord["lon"], timezone_offset)
+    else:
+        sunrise = sunset = np.full(len(starts), np.nan)
+
+    dates = np.datetime_as_string(day[starts].astype("datetime64[D]"))
+    return [
+        {
+            "date": str(dates[i]),
+            "temp_min": round(float(temp_min[i]), 1),
+            "temp_max": round(float(temp_max[i]), 1),
+            "temp_mean": round(float(temp_mean[i]), 1),
+            "description": str(dominant[i]).title(),
+            "precipitation_probability": int(round(float(pop[i]) * 100)),
+            "precipitation_mm": round(float(precip[i]), 1),
+            "wind_max": round(float(wind_max[i]), 1),
+            "humidity": int(round(float(humidity[i]))),
+            "sunrise": _clock(sunrise[i]),
+            "sunset": _clock(sunset[i]),
+        }
+        for i in range(len(starts))
+    ]
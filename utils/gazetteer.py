@@ -0,0 +1,218 @@
+# utils/gazetteer.py
+import re
+import bisect
+import difflib
+import threading
+import unicodedata
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+DATA_PATH = Path(__file__).parent / "data" / "cities.tsv"
+
+# Fuzzy matches are never queried in place of what the user typed ("Georgetown"
+# is not "George Town, MY"), they only become "did you mean" suggestions
+SUGGEST_RATIO = 0.6
+MIN_FUZZY_LENGTH = 4
+
+# Country names / codes people type that are not the ISO code OpenWeather expects
+COUNTRY_ALIASES = {"uk": "gb", "england": "gb", "scotland": "gb", "wales": "gb", "usa": "us", "america": "us"}
+
+_APOSTROPHES = re.compile(r"['’`]")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_place(text: str) -> str:
+    """Accents folded, lowercase, punctuation collapsed: "Zürich", "zurich " and "ZURICH" share a key"""
+    folded = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return " ".join(_NON_ALNUM.sub(" ", _APOSTROPHES.sub("", folded.lower())).split())
+
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class City:
+    __slots__ = ("id", "name", "country", "lat", "lon", "population")
+
+    def __init__(self, id: str, name: str, country: str, lat: float, lon: float, population: int = 0):
+        self.id = id
+        self.name = name
+        self.country = country
+        self.lat = lat
+        self.lon = lon
+        self.population = population
+
+    @property
+    def label(self) -> str:
+        return f"{self.name}, {self.country}"
+
+    def __repr__(self) -> str:
+        return f"City({self.id!r})"
+
+
+class Gazetteer:
+    """
+    In-process city index built from the bundled dataset. Names and aliases
+    are normalized into one key space; resolve() is an exact dict hit only
+    (case, accents, punctuation and aliases aside), suggest() adds fuzzy
+    matches (trigram candidates ranked by difflib ratio). Ambiguous names
+    ("Paris", "Hyderabad") resolve to the most populous city unless a
+    country code is given.
+    """
+
+    def __init__(self, cities: List[City]):
+        self.cities = cities
+        self.by_id = {city.id: city for city in cities}
+        self._names: Dict[str, List[City]] = defaultdict(list)
+        self._keys: List[str] = []
+        self._trigram_index: Dict[str, List[str]] = defaultdict(list)
+
+        self.exact = 0
+        self.unresolved = 0
+
+    @classmethod
+    def load(cls, path: Path = DATA_PATH) -> "Gazetteer":
+        """One city per line: id, name, country, lat, lon, population (thousands), comma-separated aliases"""
+        cities, aliases = [], []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                fields = line.rstrip("\n").split("\t")
+                city = City(
+                    fields[0], fields[1], fields[2], float(fields[3]), float(fields[4]),
+                    int(fields[5]) * 1000 if len(fields) > 5 and fields[5] else 0,
+                )
+                cities.append(city)
+                extra = fields[6].split(",") if len(fields) > 6 and fields[6] else []
+                aliases.append([city.name] + extra)
+
+        gazetteer = cls(cities)
+        for city, names in zip(cities, aliases):
+            for name in names:
+                gazetteer._add_name(normalize_place(name), city)
+        gazetteer._finish()
+        return gazetteer
+
+    def _add_name(self, key: str, city: City):
+        if key and city not in self._names[key]:
+            self._names[key].append(city)
+
+    def _finish(self):
+        for key, cities in self._names.items():
+            cities.sort(key=lambda c: -c.population)
+            for gram in _trigrams(key):
+                self._trigram_index[gram].append(key)
+        self._keys = sorted(self._names)
+
+    def __len__(self) -> int:
+        return len(self.cities)
+
+    # ======================================================
+    #   LOOKUP
+    # ======================================================
+    @staticmethod
+    def _split(text: str, country_code: Optional[str]) -> Tuple[str, str]:
+        """'new york,US' -> ('new york', 'us'); an explicit country_code wins"""
+        name, sep, tail = text.rpartition(",")
+        country = normalize_place(country_code or "")
+        if sep and len(normalize_place(tail)) >= 2:
+            tail = normalize_place(tail)
+            if len(tail) == 2 or tail in COUNTRY_ALIASES:
+                country = country or tail
+                text = name
+        country = COUNTRY_ALIASES.get(country, country)
+        return normalize_place(text), country
+
+    def _candidates(self, key: str, country: str) -> List[City]:
+        cities = self._names.get(key, [])
+        if country:
+            cities = [c for c in cities if c.country.lower() == country]
+        return cities
+
+    def _fuzzy_keys(self, key: str, country: str, cutoff: float) -> List[Tuple[float, str]]:
+        """Indexed names close to `key`, best first: trigram overlap shortlists, difflib ranks"""
+        overlap: Dict[str, int] = defaultdict(int)
+        for gram in _trigrams(key):
+            for candidate in self._trigram_index.get(gram, ()):
+                overlap[candidate] += 1
+        shortlist = sorted(overlap, key=overlap.get, reverse=True)[:50]
+
+        matcher = difflib.SequenceMatcher(None, "", key)
+        scored = []
+        for candidate in shortlist:
+            matcher.set_seq1(candidate)
+            if matcher.real_quick_ratio() < cutoff or matcher.quick_ratio() < cutoff:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= cutoff and self._candidates(candidate, country):
+                scored.append((ratio, candidate))
+        scored.sort(key=lambda pair: -pair[0])
+        return scored
+
+    def _fuzzy(self, key: str, country: str, cutoff: float, limit: int) -> List[City]:
+        found = []
+        for _, candidate in self._fuzzy_keys(key, country, cutoff):
+            found.extend(self._candidates(candidate, country))
+        return found[:limit]
+
+    def _prefix(self, key: str, country: str, limit: int) -> List[City]:
+        found = []
+        start = bisect.bisect_left(self._keys, key)
+        for candidate in self._keys[start:]:
+            if not candidate.startswith(key):
+                break
+            found.extend(self._candidates(candidate, country))
+        found.sort(key=lambda c: -c.population)
+        return found[:limit]
+
+    def resolve(self, text: str, country_code: Optional[str] = None) -> Optional[City]:
+        """Canonical city for free text ("NYC", "new york,US", "Zurich"), or None if not a known name"""
+        key, country = self._split(text or "", country_code)
+        if not key:
+            return None
+        cities = self._candidates(key, country)
+        if not cities:
+            self.unresolved += 1
+            return None
+        self.exact += 1
+        return cities[0]
+
+    def suggest(self, text: str, country_code: Optional[str] = None, limit: int = 3) -> List[City]:
+        """"Did you mean" candidates: name prefixes first, then close spellings"""
+        key, country = self._split(text or "", country_code)
+        if not key:
+            return []
+        found = self._prefix(key, country, limit)
+        if len(key) >= MIN_FUZZY_LENGTH - 1:
+            found += self._fuzzy(key, country, SUGGEST_RATIO, limit=limit * 2)
+        suggestions, seen = [], set()
+        for city in found:
+            if city.id not in seen:
+                seen.add(city.id)
+                suggestions.append(city)
+        return suggestions[:limit]
+
+    def get_stats(self) -> Dict:
+        return {
+            "cities": len(self.cities),
+            "names": len(self._keys),
+            "exact": self.exact,
+            "unresolved": self.unresolved,
+        }
+
+
+_gazetteer: Optional[Gazetteer] = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+    """Shared index, parsed from the bundled dataset on first use"""
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                _gazetteer = Gazetteer.load()
+    return _gazetteer
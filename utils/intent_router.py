@@ -0,0 +1,107 @@
+# utils/intent_router.py
+import re
+import itertools
+from typing import Dict, List, Optional
+from utils.llm_service import ToolCall
+from utils.prompts import GREETING_REPLIES, THANKS_REPLIES, GOODBYE_REPLIES
+
+# Whole-message patterns only: anything with extra content goes to the LLM
+GREETING_PATTERN = re.compile(
+    r"^(hi+|hello+|hey+|hiya|howdy|yo|greetings|good (morning|afternoon|evening|day))"
+    r"( there| bot| buddy| friend)?[\s!.,:)]*$",
+    re.IGNORECASE,
+)
+THANKS_PATTERN = re.compile(
+    r"^(thanks?|thank you|thx|ty|cheers|great,? thanks?|ok(ay)?,? thanks?)( (so|very) much| a lot)?[\s!.,:)]*$",
+    re.IGNORECASE,
+)
+GOODBYE_PATTERN = re.compile(r"^(bye|goodbye|good bye|see ya|see you( later)?|cya)[\s!.,:)]*$", re.IGNORECASE)
+
+_CITY = r"(?P<city>[a-z][a-z .'\-]{0,58}?[a-z.])(?:\s*,\s*(?P<country>[a-z]{2}))?"
+_NOW = r"(?:\s+(?:right now|now|currently|today))?"
+_END = r"\s*[?!.]*$"
+MAX_FORECAST_DAYS = 5  # OpenWeather /forecast, same clamp as mcp_server.dispatch
+WEATHER_PATTERNS = [
+    re.compile(rf"^(?:what(?:'s| is) the |how(?:'s| is) the )?(?:current )?weather(?: like)? (?:in|for|at) {_CITY}{_NOW}{_END}", re.IGNORECASE),
+    re.compile(rf"^(?:current )?weather {_CITY}{_NOW}{_END}", re.IGNORECASE),
+    re.compile(rf"^{_CITY} weather{_NOW}{_END}", re.IGNORECASE),
+]
+FORECAST_PATTERNS = [
+    re.compile(rf"^(?:what(?:'s| is) the |show me the |get me the )?(?:(?P<days>\d+)[- ]day |weekly )?(?:weather )?forecast (?:in|for|at) {_CITY}{_END}", re.IGNORECASE),
+    re.compile(rf"^(?:weather )?forecast {_CITY}{_END}", re.IGNORECASE),
+    re.compile(rf"^{_CITY} (?:weather )?forecast{_END}", re.IGNORECASE),
+]
+# "weather in my area", "forecast for tomorrow", ... are not city names
+NOT_A_CITY = {
+    "my", "me", "your", "the", "this", "that", "here", "there", "our", "it", "a", "an", "general",
+    "today", "tomorrow", "tonight", "now", "weekend", "week", "next", "summer", "winter", "spring",
+    "autumn", "fall", "morning", "evening", "afternoon", "weather", "forecast", "for", "in", "at", "like",
+}
+# "Paris and Rome", "london please", "Paris with umbrella": several cities or extra asks, the LLM handles those
+NOT_A_SINGLE_CITY = {"and", "or", "vs", "versus", "with", "please", "pls", "plus", "compared", "then", "also"}
+
+
+class RoutedIntent:
+    def __init__(self, kind: str, reply: Optional[str] = None, tool_calls: Optional[List[ToolCall]] = None):
+        self.kind = kind
+        self.reply = reply
+        self.tool_calls = tool_calls
+
+
+class IntentRouter:
+    """
+    Rule-based pre-classifier in front of the LLM. Greetings, thanks and
+    goodbyes get a canned reply; explicit "weather in <city>" and
+    "forecast for <city>" requests go straight to the tool. Everything
+    else returns None and takes the normal LLM path.
+    """
+
+    def __init__(self):
+        self._replies = {
+            "greeting": itertools.cycle(GREETING_REPLIES),
+            "thanks": itertools.cycle(THANKS_REPLIES),
+            "goodbye": itertools.cycle(GOODBYE_REPLIES),
+        }
+        self.counts: Dict[str, int] = {"greeting": 0, "thanks": 0, "goodbye": 0, "weather": 0, "forecast": 0, "llm": 0}
+
+    def route(self, message: str) -> Optional[RoutedIntent]:
+        text = " ".join(message.strip().split())
+        intent = self._classify(text)
+        self.counts[intent.kind if intent else "llm"] += 1
+        return intent
+
+    def _classify(self, text: str) -> Optional[RoutedIntent]:
+        for kind, pattern in (("greeting", GREETING_PATTERN), ("thanks", THANKS_PATTERN), ("goodbye", GOODBYE_PATTERN)):
+            if pattern.match(text):
+                return RoutedIntent(kind, reply=next(self._replies[kind]))
+
+        for kind, tool, patterns in (
+            ("forecast", "get_forecast", FORECAST_PATTERNS),
+            ("weather", "get_weather", WEATHER_PATTERNS),
+        ):
+            for pattern in patterns:
+                match = pattern.match(text)
+                if match:
+                    arguments = self._tool_arguments(match)
+                    if arguments:
+                        return RoutedIntent(kind, tool_calls=[ToolCall(tool, arguments)])
+        return None
+
+    @staticmethod
+    def _tool_arguments(match: re.Match) -> Optional[dict]:
+        city = match.group("city").strip(" .'-")
+        if "," in city or "&" in city:
+            return None
+        words = [word.strip(".") for word in city.lower().split()]
+        if not words or any(word in NOT_A_CITY or word in NOT_A_SINGLE_CITY for word in words):
+            return None
+        arguments = {"city": city.title() if city.islower() else city}
+        if match.group("country"):
+            arguments["country_code"] = match.group("country").upper()
+        days = match.groupdict().get("days")
+        if days:
+            arguments["days"] = min(max(int(days), 1), MAX_FORECAST_DAYS)
+        return arguments
+
+    def get_stats(self) -> dict:
+        return dict(self.counts)
@@ -1,8 +1,18 @@
+import groq
 from groq import AsyncGroq
 import json
 from Core.config import settings
+from utils.resilience import get_upstream, is_transient
 from utils.prompts import SYSTEM_PROMPT, TOOL_RESPONSE_PROMPT, get_tool_definitions_gemini
-from typing import List, Dict, Optional, Tuple
+from typing import AsyncIterator, List, Dict, Optional, Tuple, Union
+
+LLM_ERROR_REPLY = "Sorry, having trouble."
+
+
+def is_transient_groq(error: Exception) -> bool:
+    """Connection errors and timeouts raised by the Groq SDK, plus the usual 408/429/5xx"""
+    return isinstance(error, groq.APIConnectionError) or is_transient(error)
+
 
 class ToolCall:
     def __init__(self, name: str, arguments: dict):
@@ -11,19 +21,23 @@ class ToolCall:
 
 class LLMService:
     def __init__(self):
-        self.client = AsyncGroq(api_key=settings.GROQ_API_KEY)
+        # The SDK's own retries are off: self.upstream retries, rate-limits and trips the breaker
+        self.client = AsyncGroq(api_key=settings.GROQ_API_KEY, max_retries=0)
+        self.upstream = get_upstream(
+            "groq", settings.GROQ_RATE_LIMIT_PER_MINUTE, settings.GROQ_RATE_LIMIT_BURST, transient=is_transient_groq
+        )
 
     async def get_completion(self, messages: List[dict], use_tools: bool = True):
         try:
             tools = get_tool_definitions_gemini() if use_tools else None
-            response = await self.client.chat.completions.create(
+            response = await self.upstream.call(lambda: self.client.chat.completions.create(
                 model=settings.LLM_MODEL,
                 messages=messages,
                 tools=tools,
                 tool_choice="auto" if use_tools else "none",
                 temperature=0.7,
                 max_tokens=800
-            )
+            ))
             msg = response.choices[0].message
             if msg.tool_calls:
                 calls = []
@@ -34,9 +48,57 @@ class LLMService:
             return msg.content or "", None
         except Exception as e:
             print("GROQ ERROR:", e)
-            return "Sorry, having trouble.", None
+            return LLM_ERROR_REPLY, None
 
-    async def format_weather_response(self, data: dict, query: str) -> str:
+    def get_stats(self) -> Dict:
+        return self.upstream.get_stats()
+
+    async def format_weather_response(self, data: Union[dict, List[dict]], query: str) -> str:
         prompt = TOOL_RESPONSE_PROMPT.format(weather_data=json.dumps(data, indent=2), user_message=query)
         resp, _ = await self.get_completion([{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": prompt}], False)
-        return resp
\ No newline at end of file
+        return resp
+
+    async def stream_completion(self, messages: List[dict], use_tools: bool = True) -> AsyncIterator[Tuple[str, object]]:
+        """Stream a completion as ("token", text) events, plus one ("tool_calls", [ToolCall]) event if the model calls tools"""
+        try:
+            tools = get_tool_definitions_gemini() if use_tools else None
+            # Only opening the stream is retried: once tokens went out, a retry would repeat them
+            stream = await self.upstream.call(lambda: self.client.chat.completions.create(
+                model=settings.LLM_MODEL,
+                messages=messages,
+                tools=tools,
+                tool_choice="auto" if use_tools else "none",
+                temperature=0.7,
+                max_tokens=800,
+                stream=True
+            ))
+            # Tool calls arrive as fragments keyed by index, stitch them together
+            pending: Dict[int, dict] = {}
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    yield "token", delta.content
+                for tc in delta.tool_calls or []:
+                    entry = pending.setdefault(tc.index, {"name": "", "arguments": ""})
+                    if tc.function and tc.function.name:
+                        entry["name"] += tc.function.name
+                    if tc.function and tc.function.arguments:
+                        entry["arguments"] += tc.function.arguments
+            if pending:
+                calls = [
+                    ToolCall(entry["name"], json.loads(entry["arguments"] or "{}"))
+                    for _, entry in sorted(pending.items())
+                ]
+                yield "tool_calls", calls
+        except Exception as e:
+            print("GROQ STREAM ERROR:", e)
+            yield "token", LLM_ERROR_REPLY
+
+    async def stream_weather_response(self, data: Union[dict, List[dict]], query: str) -> AsyncIterator[str]:
+        prompt = TOOL_RESPONSE_PROMPT.format(weather_data=json.dumps(data, indent=2), user_message=query)
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": prompt}]
+        async for kind, payload in self.stream_completion(messages, False):
+            if kind == "token":
+                yield payload
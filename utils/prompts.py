@@ -30,6 +30,34 @@ Provide a friendly response that:
 
 Format the temperature, conditions, and other details in a clear way."""
 
+# Local templates for simple single-city answers (no second LLM call)
+WEATHER_TEMPLATE = """{emoji} Right now in {city}{country_suffix} it's {temperature}°C (feels like {feels_like}°C) with {description_lower}.
+💧 Humidity: {humidity}% | 💨 Wind: {wind_speed} m/s
+🌡️ Today's range: {temp_min}°C – {temp_max}°C"""
+
+FORECAST_TEMPLATE_HEADER = "📅 Here's the forecast for {city}{country_suffix}:"
+
+FORECAST_TEMPLATE_DAY = "{emoji} {pretty_date}: {temp_min}°C – {temp_max}°C, {description_lower}{precipitation}"
+
+FORECAST_TEMPLATE_PRECIPITATION = " (☔ {probability}% chance, {amount} mm)"
+
+# Canned replies for messages the local intent router answers without the LLM
+GREETING_REPLIES = [
+    "Hi there! 👋 I'm your weather assistant. Which city would you like the weather for?",
+    "Hello! 🌤️ Tell me a city and I'll get you the current weather or a forecast.",
+    "Hey! 😊 Ask me about the weather anywhere, e.g. \"weather in London\".",
+]
+
+THANKS_REPLIES = [
+    "You're welcome! 😊 Anything else you'd like to know about the weather?",
+    "Happy to help! 🌈 Just ask if you need another forecast.",
+]
+
+GOODBYE_REPLIES = [
+    "Goodbye! 👋 Have a great day, whatever the weather!",
+    "See you later! ☀️ Stay dry out there.",
+]
+
 def get_tool_definitions():
     """Return tool definitions for OpenAI/Groq function calling (lowercase types)"""
     return [
@@ -57,7 +85,8 @@ def get_tool_definitions():
                     "type": "object",
                     "properties": {
                         "city": {"type": "string", "description": "The city name"},
-                        "country_code": {"type": "string", "description": "Optional 2-letter country code"}
+                        "country_code": {"type": "string", "description": "Optional 2-letter country code"},
+                        "days": {"type": "integer", "description": "Optional number of days, 1-5 (default 5)"}
                     },
                     "required": ["city"]
                 }
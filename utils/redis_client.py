@@ -0,0 +1,60 @@
+# utils/redis_client.py
+from typing import Optional
+from Core.config import settings
+
+_client = None
+
+
+def get_redis_client():
+    """Process-wide async Redis client backed by one connection pool"""
+    global _client
+    if _client is None:
+        import redis.asyncio as redis
+
+        pool = redis.ConnectionPool.from_url(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            decode_responses=True,
+        )
+        _client = redis.Redis(connection_pool=pool)
+    return _client
+
+
+def set_redis_client(client):
+    """Use an existing client instead (e.g. fakeredis.aioredis.FakeRedis in tests)"""
+    global _client
+    _client = client
+
+
+def redis_key(*parts) -> str:
+    return settings.REDIS_KEY_PREFIX + ":".join(str(p) for p in parts)
+
+
+def redis_enabled() -> bool:
+    return (
+        settings.SESSION_STORE_BACKEND.lower() == "redis"
+        or settings.WEATHER_CACHE_BACKEND.lower() == "redis"
+    )
+
+
+async def ping_redis() -> bool:
+    if not redis_enabled():
+        return False
+    try:
+        return bool(await get_redis_client().ping())
+    except Exception as e:
+        print("Redis ping failed:", e)
+        return False
+
+
+async def close_redis_client():
+    global _client
+    client: Optional[object] = _client
+    _client = None
+    if client is None:
+        return
+    close = getattr(client, "aclose", None) or client.close
+    await close()
+    pool = getattr(client, "connection_pool", None)
+    if pool is not None:
+        await pool.disconnect()
@@ -0,0 +1,290 @@
+# utils/resilience.py
+import time
+import random
+import asyncio
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+import httpx
+from Core.config import settings
+
+
+class UpstreamUnavailable(Exception):
+    """The call was not attempted (breaker open or rate limit wait too long)"""
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    pass
+
+
+class RateLimitExceeded(UpstreamUnavailable):
+    pass
+
+
+# ======================================================
+#   ERROR CLASSIFICATION
+# ======================================================
+def status_code(error: Exception) -> Optional[int]:
+    """HTTP status of an httpx or SDK (Groq) status error, None for anything else"""
+    code = getattr(error, "status_code", None)
+    if code is None:
+        response = getattr(error, "response", None)
+        code = getattr(response, "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds from the Retry-After header (delta-seconds or HTTP date), if the error carries one"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    value = headers.get("retry-after") if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_transient(error: Exception) -> bool:
+    """Worth retrying: network trouble, timeouts, 408/429 and 5xx. A 404 or 401 is not"""
+    if isinstance(error, (httpx.TransportError, asyncio.TimeoutError)):
+        return True
+    code = status_code(error)
+    return code is not None and (code in (408, 429) or code >= 500)
+
+
+# ======================================================
+#   BUILDING BLOCKS
+# ======================================================
+class TokenBucket:
+    """
+    Async token bucket: `rate` tokens per second, bursts up to `capacity`.
+    Callers reserve a token and sleep until it is theirs (no lock needed on
+    one event loop); a reservation further out than max_wait is refused.
+    """
+
+    def __init__(self, rate: float, capacity: float, max_wait: float = 5.0):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.max_wait = max_wait
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self.waits = 0
+        self.rejected = 0
+
+    @classmethod
+    def per_minute(cls, calls: float, burst: float, max_wait: float = 5.0) -> Optional["TokenBucket"]:
+        """Bucket for a per-minute quota, None when the quota is 0 (unlimited)"""
+        return cls(calls / 60.0, burst, max_wait) if calls > 0 else None
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def pause(self, seconds: float):
+        """Upstream said Retry-After: nobody goes out before then"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self) -> bool:
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= 1
+        wait = max(-self.tokens / self.rate if self.tokens < 0 else 0.0, self._paused_until - now)
+        if wait > self.max_wait:
+            self.tokens += 1
+            self.rejected += 1
+            return False
+        if wait > 0:
+            self.waits += 1
+            await asyncio.sleep(wait)
+        return True
+
+    def get_stats(self) -> Dict:
+        self._refill(time.monotonic())
+        return {
+            "rate_per_minute": round(self.rate * 60, 2),
+            "capacity": self.capacity,
+            "tokens": round(self.tokens, 2),
+            "waits": self.waits,
+            "rejected": self.rejected,
+        }
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive transient failures;
+    open -> half-open after `reset_timeout` seconds, where one probe call is
+    let through: success closes the breaker, failure opens it again.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.opened = 0
+        self.short_circuited = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probing = False
+        return self._state
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self.short_circuited += 1
+        return False
+
+    def release(self):
+        """Give back a half-open probe slot whose call ended without a verdict"""
+        self._probing = False
+
+    def record_success(self):
+        self._state = self.CLOSED
+        self._failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        self._failures += 1
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                self.opened += 1
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._probing = False
+
+    def get_stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "opened": self.opened,
+            "short_circuited": self.short_circuited,
+        }
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter; a Retry-After longer than max_delay is not waited out"""
+
+    def __init__(self, attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, hint: Optional[float] = None) -> Optional[float]:
+        if hint is not None:
+            return hint if hint <= self.max_delay else None
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+# ======================================================
+#   UPSTREAM
+# ======================================================
+class Upstream:
+    """
+    Outbound call guard for one external API: rate limit, circuit breaker
+    and retries of transient failures. Raises the last error when every
+    attempt failed, CircuitOpenError / RateLimitExceeded when the call was
+    not made at all. Only wrap idempotent calls: they may run more than once.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limiter: Optional[TokenBucket] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        retry: Optional[RetryPolicy] = None,
+        transient: Callable[[Exception], bool] = is_transient,
+    ):
+        self.name = name
+        self.limiter = limiter
+        self.breaker = breaker or CircuitBreaker()
+        self.retry = retry or RetryPolicy()
+        self.transient = transient
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+
+    async def call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} temporarily unavailable (circuit open)")
+        probe = self.breaker.state == CircuitBreaker.HALF_OPEN
+        try:
+            return await self._attempts(fn)
+        finally:
+            # Cancelled, rate limited or failed without a verdict: let the next call probe instead
+            if probe and self.breaker.state == CircuitBreaker.HALF_OPEN:
+                self.breaker.release()
+
+    async def _attempts(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        for attempt in range(self.retry.attempts):
+            if self.limiter is not None and not await self.limiter.acquire():
+                raise RateLimitExceeded(f"{self.name} rate limit reached, try again shortly")
+            try:
+                result = await fn()
+            except Exception as e:
+                if not self.transient(e):
+                    if status_code(e) is not None:
+                        # 4xx answers mean upstream is up, they just aren't retryable
+                        self.breaker.record_success()
+                    raise
+                self.failures += 1
+                self.breaker.record_failure()
+                hint = retry_after(e)
+                if hint is not None and self.limiter is not None:
+                    self.limiter.pause(hint)
+                delay = self.retry.delay(attempt, hint)
+                if attempt + 1 >= self.retry.attempts or delay is None or self.breaker.state != CircuitBreaker.CLOSED:
+                    raise
+                self.retries += 1
+                print(f"{self.name} call failed ({e}), retry {attempt + 1} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
+
+    def get_stats(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "breaker": self.breaker.get_stats(),
+            "rate_limit": self.limiter.get_stats() if self.limiter is not None else None,
+        }
+
+
+_upstreams: Dict[str, Upstream] = {}
+
+
+def get_upstream(name: str, per_minute: float, burst: int,
+                 transient: Callable[[Exception], bool] = is_transient) -> Upstream:
+    """One guard per API per process, so every client of that API shares its quota and breaker"""
+    upstream = _upstreams.get(name)
+    if upstream is None:
+        upstream = _upstreams[name] = Upstream(
+            name,
+            limiter=TokenBucket.per_minute(per_minute, burst, max_wait=settings.RATE_LIMIT_MAX_WAIT),
+            breaker=CircuitBreaker(settings.CIRCUIT_BREAKER_FAILURES, settings.CIRCUIT_BREAKER_RESET),
+            retry=RetryPolicy(
+                settings.UPSTREAM_RETRY_ATTEMPTS, settings.UPSTREAM_RETRY_BASE_DELAY, settings.UPSTREAM_RETRY_MAX_DELAY
+            ),
+            transient=transient,
+        )
+    return upstream
@@ -0,0 +1,94 @@
+# utils/response_templates.py
+import re
+from datetime import datetime
+from typing import Dict, Optional
+from utils.prompts import (
+    WEATHER_TEMPLATE, FORECAST_TEMPLATE_HEADER, FORECAST_TEMPLATE_DAY, FORECAST_TEMPLATE_PRECIPITATION
+)
+
+# Anything asking for advice, comparison or explanation still goes through the LLM
+COMPLEX_QUESTION_PATTERN = re.compile(
+    r"\b(should|wear|umbrella|jacket|coat|compare|comparison|vs|versus|better|worse|recommend|"
+    r"advice|suggest|plan|why|explain|safe|travel|trip|good for|ok to|okay to|best|"
+    # Units the template can't honour (it always answers in metric)
+    r"fahrenheit|imperial|kelvin|mph|"
+    # Time windows and yes/no outlooks: the template only shows current conditions / day summaries
+    r"tonight|morning|afternoon|evening|night|later|tomorrow|weekend|hourly|hours?|will it|going to|chance)\b"
+    r"|°\s*f\b",
+    re.IGNORECASE,
+)
+MAX_SIMPLE_QUESTION_WORDS = 15
+MIN_PRECIPITATION_CHANCE = 30  # percent; lower chances are left out of the forecast lines
+
+
+def is_simple_weather_question(message: str) -> bool:
+    """True for short 'weather in X' / 'forecast for X' style questions"""
+    if len(message.split()) > MAX_SIMPLE_QUESTION_WORDS:
+        return False
+    return COMPLEX_QUESTION_PATTERN.search(message) is None
+
+
+def weather_emoji(description: str) -> str:
+    description = (description or "").lower()
+    if "thunder" in description:
+        return "⛈️"
+    if "snow" in description:
+        return "❄️"
+    if "rain" in description or "drizzle" in description:
+        return "🌧️"
+    if "cloud" in description:
+        return "☁️"
+    if "clear" in description:
+        return "☀️"
+    if "mist" in description or "fog" in description or "haze" in description:
+        return "🌫️"
+    return "🌤️"
+
+
+def render_weather(data: Dict) -> str:
+    return WEATHER_TEMPLATE.format(
+        emoji=weather_emoji(data["description"]),
+        city=data["city"],
+        country_suffix=f", {data['country']}" if data.get("country") else "",
+        temperature=data["temperature"],
+        feels_like=data["feels_like"],
+        description_lower=data["description"].lower(),
+        humidity=data["humidity"],
+        wind_speed=data["wind_speed"],
+        temp_min=data.get("temp_min", data["temperature"]),
+        temp_max=data.get("temp_max", data["temperature"]),
+    )
+
+
+def render_forecast(data: Dict) -> str:
+    lines = [FORECAST_TEMPLATE_HEADER.format(
+        city=data["city"],
+        country_suffix=f", {data['country']}" if data.get("country") else "",
+    )]
+    for day in data["forecasts"]:
+        pretty_date = datetime.strptime(day["date"], "%Y-%m-%d").strftime("%a, %b %d")
+        lines.append(FORECAST_TEMPLATE_DAY.format(
+            emoji=weather_emoji(day["description"]),
+            pretty_date=pretty_date,
+            temp_min=day["temp_min"],
+            temp_max=day["temp_max"],
+            description_lower=day["description"].lower(),
+            precipitation=FORECAST_TEMPLATE_PRECIPITATION.format(
+                probability=day["precipitation_probability"], amount=day.get("precipitation_mm", 0.0)
+            ) if day.get("precipitation_probability", 0) >= MIN_PRECIPITATION_CHANCE else "",
+        ))
+    return "\n".join(lines)
+
+
+def render_tool_result(tool: str, data: Dict) -> Optional[str]:
+    """Render one successful tool result, or None if the data doesn't fit a template"""
+    if not isinstance(data, dict) or "error" in data:
+        return None
+    try:
+        if tool == "get_weather":
+            return render_weather(data)
+        if tool == "get_forecast" and data.get("forecasts"):
+            return render_forecast(data)
+    except (KeyError, TypeError, ValueError) as e:
+        print("Template rendering error:", e)
+    return None
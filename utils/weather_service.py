@@ -1,14 +1,260 @@
 # utils/weather_service.py
 import httpx
+import asyncio
 from typing import Dict, Optional
 from Core.config import settings
 from datetime import datetime
+from utils.cache import TTLCache, RedisCache, SingleFlight
+from utils.cache_warmer import CacheWarmer
+from utils.gazetteer import City, get_gazetteer
+from utils.resilience import get_upstream, status_code
+from utils.forecast_aggregation import aggregate_forecast
 
 
 class WeatherService:
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         self.api_key = settings.OPENWEATHER_API_KEY
         self.base_url = settings.OPENWEATHER_BASE_URL or "https://api.openweathermap.org/data/2.5"
+        self._client = client
+        self.units = "metric"
+        self.cache = (
+            TTLCache(
+                max_size=settings.WEATHER_CACHE_MAX_SIZE,
+                default_ttl=settings.WEATHER_CACHE_TTL,
+                # Expired entries stay around for the outage fallback, SWR only serves the recent ones
+                stale_ttl=max(settings.WEATHER_CACHE_STALE_TTL, settings.WEATHER_CACHE_OUTAGE_TTL),
+            )
+            if settings.WEATHER_CACHE_ENABLED else None
+        )
+        # Optional second tier shared by every worker / node
+        self.shared_cache = (
+            RedisCache(namespace="weather")
+            if settings.WEATHER_CACHE_ENABLED and settings.WEATHER_CACHE_BACKEND.lower() == "redis" else None
+        )
+        self.inflight = SingleFlight()
+        # Shared with every other WeatherService in the process: one quota, one breaker
+        self.upstream = get_upstream(
+            "openweather", settings.OPENWEATHER_RATE_LIMIT_PER_MINUTE, settings.OPENWEATHER_RATE_LIMIT_BURST
+        )
+        # Popularity tracking always runs; the refresh loop only once start_warmer() is called
+        self.warmer = CacheWarmer(
+            self.cache,
+            top_n=settings.CACHE_WARMER_TOP_N,
+            interval=settings.CACHE_WARMER_INTERVAL,
+            refresh_ahead=settings.CACHE_WARMER_REFRESH_AHEAD,
+            half_life=settings.CACHE_WARMER_HALF_LIFE,
+            min_score=settings.CACHE_WARMER_MIN_SCORE,
+            concurrency=settings.TOOL_CALL_CONCURRENCY,
+        ) if self.cache is not None and settings.CACHE_WARMER_ENABLED else None
+        self._background = set()
+        self.stale_served = 0
+        self.stale_fallbacks = 0
+        self.gazetteer = None
+        if settings.GAZETTEER_ENABLED:
+            try:
+                self.gazetteer = get_gazetteer()
+            except Exception as e:
+                print(f"Gazetteer unavailable, sending raw city names upstream: {e}")
+
+
+    # ======================================================
+    #   HTTP CLIENT LIFECYCLE
+    # ======================================================
+    def _build_client(self) -> httpx.AsyncClient:
+        """One pooled keep-alive client shared by every OpenWeather call"""
+        limits = httpx.Limits(
+            max_connections=settings.OPENWEATHER_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENWEATHER_MAX_KEEPALIVE,
+            keepalive_expiry=settings.OPENWEATHER_KEEPALIVE_EXPIRY,
+        )
+        http2 = settings.OPENWEATHER_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401  (httpx needs it for HTTP/2)
+            except ImportError:
+                print("h2 not installed, OpenWeather client falling back to HTTP/1.1")
+                http2 = False
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            limits=limits,
+            timeout=settings.OPENWEATHER_TIMEOUT,
+            http2=http2,
+        )
+
+    async def start(self):
+        """Create the shared client (called at app startup)"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+
+    async def close(self):
+        """Close the shared client (called at app shutdown)"""
+        await self.stop_warmer()
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Lazily created for callers that never run start() (e.g. AISuggestionsService)
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    async def _fetch(self, endpoint: str, params: Dict) -> Dict:
+        """GET through the rate limiter / breaker, transient failures retried with backoff"""
+        async def attempt() -> Dict:
+            response = await self.client.get(endpoint, params=params)
+            response.raise_for_status()
+            return response.json()
+
+        return await self.upstream.call(attempt)
+
+
+    # ======================================================
+    #   LOCATION RESOLUTION
+    # ======================================================
+    def _resolve(self, city: str, country_code: Optional[str] = None) -> Optional[City]:
+        """Known city for free text ("NYC", "new york,US"), None if the gazetteer doesn't know the name"""
+        if self.gazetteer is None:
+            return None
+        return self.gazetteer.resolve(city, country_code)
+
+    def _location_params(self, city: str, country_code: Optional[str], place: Optional[City]) -> Dict:
+        # Coordinates are unambiguous upstream; unknown places keep the old free-text query
+        if place is not None:
+            location = {"lat": place.lat, "lon": place.lon}
+        else:
+            location = {"q": f"{city},{country_code}" if country_code else city}
+        return {**location, "appid": self.api_key, "units": self.units}
+
+    def _error_result(self, error: Exception, city: str, country_code: Optional[str], place: Optional[City]) -> Dict:
+        """Error payload; an unknown name that upstream could not find gets "did you mean" candidates"""
+        result = {"error": str(error)}
+        if self.gazetteer is None or place is not None or status_code(error) != 404:
+            return result
+        suggestions = [c.label for c in self.gazetteer.suggest(city, country_code)]
+        if suggestions:
+            result["suggestions"] = suggestions
+            result["error"] = f"{result['error']} Did you mean: {'; '.join(suggestions)}?"
+        return result
+
+
+    # ======================================================
+    #   RESULT CACHE
+    # ======================================================
+    def _cache_key(self, endpoint: str, city: str, country_code: Optional[str] = None, days: int = 0,
+                   place: Optional[City] = None) -> tuple:
+        """'NYC', 'New York' and 'new york,US' share one entry once resolved to the same city"""
+        if place is not None:
+            return (endpoint, place.id, "", self.units, days)
+        city_norm = " ".join(city.split()).lower()
+        country_norm = (country_code or "").strip().lower()
+        return (endpoint, city_norm, country_norm, self.units, days)
+
+    def _cache_get(self, key: tuple) -> Optional[Dict]:
+        if self.cache is None:
+            return None
+        return self.cache.get(key)
+
+    def _cache_get_stale(self, key: tuple, max_stale: Optional[float] = None) -> Optional[Dict]:
+        """Expired entry at most max_stale seconds past its TTL (default: anything still retained)"""
+        if self.cache is None:
+            return None
+        entry = self.cache.peek(key, max_stale)
+        return entry[1] if entry is not None else None
+
+    def _cache_set(self, key: tuple, result: Dict, ttl: float):
+        # Never cache failures, the next call should retry upstream
+        if self.cache is None or "error" in result:
+            return
+        self.cache.set(key, result, ttl=ttl)
+
+    async def _load(self, key: tuple, ttl: float, fetch, refresh: bool = False) -> Dict:
+        """Cache miss path: shared cache first, then upstream (fills both tiers)"""
+        # A refresh-ahead must go upstream: the shared copy expires about when ours does
+        if self.shared_cache is not None and not refresh:
+            shared = await self.shared_cache.get(key)
+            if shared is not None:
+                self._cache_set(key, shared, ttl)
+                return shared
+
+        result = await fetch()
+        if "error" in result:
+            # Upstream down, rate limited or breaker open: an expired answer beats an error
+            stale = self._cache_get_stale(key)
+            if stale is not None:
+                self.stale_fallbacks += 1
+                return stale
+        self._cache_set(key, result, ttl)
+        if self.shared_cache is not None and "error" not in result:
+            await self.shared_cache.set(key, result, ttl)
+        return result
+
+    async def _cached(self, key: tuple, ttl: float, fetch) -> Dict:
+        """Fresh hit, else stale entry + background revalidation, else one coalesced upstream call"""
+        if self.warmer is not None:
+            self.warmer.record(key, lambda: self._refresh(key, ttl, fetch))
+
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        stale = self._cache_get_stale(key, settings.WEATHER_CACHE_STALE_TTL)
+        if stale is not None:
+            self.stale_served += 1
+            self._revalidate(key, ttl, fetch)
+            return stale
+
+        return await self.inflight.do(key, lambda: self._load(key, ttl, fetch))
+
+    async def _refresh(self, key: tuple, ttl: float, fetch) -> Dict:
+        """Warmer callback; an upstream failure is reported even though _load falls back to the stale entry"""
+        before = self.cache.peek(key) if self.cache is not None else None
+        result = await self.inflight.do(key, lambda: self._load(key, ttl, fetch, refresh=True))
+        after = self.cache.peek(key) if self.cache is not None else None
+        # A real refresh always moves the expiry forward
+        if "error" not in result and before is not None and after is not None and after[0] <= before[0]:
+            return {"error": "upstream refresh failed, kept the cached entry"}
+        return result
+
+    def _revalidate(self, key: tuple, ttl: float, fetch):
+        """Refresh in the background; a failed refresh leaves the stale entry in place"""
+        task = asyncio.ensure_future(self.inflight.do(key, lambda: self._load(key, ttl, fetch)))
+        self._background.add(task)
+        task.add_done_callback(self._background_done)
+
+    def _background_done(self, task: asyncio.Task):
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Weather cache revalidation failed: {task.exception()}")
+
+    def start_warmer(self):
+        """Begin refreshing hot locations ahead of expiry (called from the MCP server lifespan)"""
+        if self.warmer is not None:
+            self.warmer.start()
+
+    async def stop_warmer(self):
+        if self.warmer is not None:
+            await self.warmer.stop()
+
+    def get_cache_stats(self) -> Dict:
+        if self.cache is None:
+            return {"enabled": False, "single_flight": self.inflight.get_stats(), "upstream": self.upstream.get_stats()}
+        stats = {
+            "enabled": True,
+            **self.cache.get_stats(),
+            "stale_served": self.stale_served,
+            "stale_fallbacks": self.stale_fallbacks,
+            "single_flight": self.inflight.get_stats(),
+            "upstream": self.upstream.get_stats(),
+        }
+        if self.warmer is not None:
+            stats["warmer"] = self.warmer.get_stats()
+        if self.gazetteer is not None:
+            stats["gazetteer"] = self.gazetteer.get_stats()
+        if self.shared_cache is not None:
+            stats["redis"] = self.shared_cache.get_stats()
+        return stats
 
 
     # ======================================================
@@ -18,17 +264,20 @@ class WeatherService:
         if not city:
             return {"error": "City name is required."}
 
-        location = f"{city},{country_code}" if country_code else city
-        url = f"{self.base_url}/weather"
-        params = {"q": location, "appid": self.api_key, "units": "metric"}
+        place = self._resolve(city, country_code)
+        key = self._cache_key("weather", city, country_code, place=place)
+        return await self._cached(
+            key, settings.WEATHER_CACHE_TTL, lambda: self._get_weather_uncached(city, country_code, place)
+        )
+
+    async def _get_weather_uncached(self, city: str, country_code: Optional[str] = None,
+                                    place: Optional[City] = None) -> Dict:
+        params = self._location_params(city, country_code, place)
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, params=params, timeout=20)
-                response.raise_for_status()
-                data = response.json()
+            data = await self._fetch("/weather", params)
         except Exception as e:
-            return {"error": str(e)}
+            return self._error_result(e, city, country_code, place)
 
         # TIMEZONE OFFSET (seconds)
         timezone_offset = data.get("timezone", 0)
@@ -49,8 +298,9 @@ class WeatherService:
 
         # Response
         return {
-            "city": data.get("name", ""),
-            "country": data.get("sys", {}).get("country", ""),
+            # Coordinate lookups name the nearest station/district, report the city that was asked for
+            "city": place.name if place else data.get("name", ""),
+            "country": place.country if place else data.get("sys", {}).get("country", ""),
 
             "temperature": round(data["main"].get("temp", 0), 1),
             "feels_like": round(data["main"].get("feels_like", 0), 1),
@@ -68,68 +318,35 @@ class WeatherService:
 
 
     # ======================================================
-    #   3-DAY FORECAST
+    #   DAILY FORECAST (up to 5 days)
     # ======================================================
     async def get_forecast(self, city: str, country_code: Optional[str] = None, days: int = 3) -> Dict:
         if not city:
             return {"error": "City name is required."}
 
-        location = f"{city},{country_code}" if country_code else city
-        url = f"{self.base_url}/forecast"
-        params = {"q": location, "appid": self.api_key, "units": "metric"}
+        # One entry per location holding every day upstream returned; `days` only slices it,
+        # so 3- and 5-day requests (and the warmer) share a single upstream call
+        place = self._resolve(city, country_code)
+        key = self._cache_key("forecast", city, country_code, place=place)
+        result = await self._cached(
+            key, settings.FORECAST_CACHE_TTL, lambda: self._get_forecast_uncached(city, country_code, place)
+        )
+        if "forecasts" not in result:
+            return result
+        return {**result, "forecasts": result["forecasts"][:max(1, days)]}
+
+    async def _get_forecast_uncached(self, city: str, country_code: Optional[str] = None,
+                                     place: Optional[City] = None) -> Dict:
+        params = self._location_params(city, country_code, place)
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, params=params, timeout=20)
-                response.raise_for_status()
-                data = response.json()
+            data = await self._fetch("/forecast", params)
         except Exception as e:
-            return {"error": str(e)}
+            return self._error_result(e, city, country_code, place)
 
         city_info = data.get("city", {})
-        timezone_offset = city_info.get("timezone", 0)
-
-        # Sunrise/Sunset (UTC)
-        sunrise_ts = city_info.get("sunrise", 0)
-        sunset_ts = city_info.get("sunset", 0)
-
-        # Convert to local time
-        sunrise = (
-            datetime.utcfromtimestamp(sunrise_ts + timezone_offset).strftime("%I:%M %p")
-            if sunrise_ts else "N/A"
-        )
-        sunset = (
-            datetime.utcfromtimestamp(sunset_ts + timezone_offset).strftime("%I:%M %p")
-            if sunset_ts else "N/A"
-        )
-
-        # Group 3-hour items into days
-        from collections import defaultdict
-        daily_forecast = defaultdict(list)
-
-        for item in data.get("list", []):
-            dt_local = item.get("dt", 0) + timezone_offset
-            date = datetime.utcfromtimestamp(dt_local).strftime("%Y-%m-%d")
-            daily_forecast[date].append(item)
-
-        # Build daily forecasts
-        forecasts = []
-        for date, items in list(daily_forecast.items())[:days]:
-            temps = [i["main"].get("temp", 0) for i in items]
-            descs = [i["weather"][0].get("description", "") for i in items]
-
-            forecast_item = {
-                "date": date,
-                "temp_min": round(min(temps), 1),
-                "temp_max": round(max(temps), 1),
-                "description": max(set(descs), key=descs.count).title(),
-                "sunrise": sunrise,
-                "sunset": sunset
-            }
-            forecasts.append(forecast_item)
-
         return {
-            "city": city_info.get("name", ""),
-            "country": city_info.get("country", ""),
-            "forecasts": forecasts
+            "city": place.name if place else city_info.get("name", ""),
+            "country": place.country if place else city_info.get("country", ""),
+            "forecasts": aggregate_forecast(data)
         }
@@ -0,0 +1,78 @@
+import math
+import faiss
+import numpy as np
+from typing import Callable, Iterable
+
+ANN_INDEX_TYPES = ("ivf_flat", "hnsw", "ivf_pq")
+
+
+def faiss_metric(metric: str) -> int:
+    """cosine runs as inner product over L2-normalized embeddings"""
+    return faiss.METRIC_L2 if metric == "l2" else faiss.METRIC_INNER_PRODUCT
+
+
+def similarity_to_distance(similarities: np.ndarray) -> np.ndarray:
+    """
+    Inner-product scores as a "lower is better" distance. For normalized
+    vectors this is exactly the squared L2 distance, so callers can keep
+    using the same thresholds whatever the metric.
+    """
+    # Empty result slots carry -FLT_MAX, their ids are -1 and get dropped anyway
+    with np.errstate(over="ignore"):
+        return 2.0 - 2.0 * similarities
+
+
+def auto_nlist(n: int) -> int:
+    return int(min(65536, max(16, 4 * math.sqrt(max(n, 1)))))
+
+
+def index_factory_string(config, n: int) -> str:
+    nlist = config.ivf_nlist or auto_nlist(n)
+    if config.index_type == "ivf_flat":
+        return f"IVF{nlist},Flat"
+    if config.index_type == "ivf_pq":
+        return f"IVF{nlist},PQ{config.pq_m}x8"
+    if config.index_type == "hnsw":
+        return f"HNSW{config.hnsw_m}"
+    raise ValueError(f"Unknown VECTORDB_INDEX_TYPE '{config.index_type}'")
+
+
+def configure_search(index: faiss.Index, config):
+    """Apply the query-time knobs (nprobe / efSearch)"""
+    if config.index_type in ("ivf_flat", "ivf_pq"):
+        faiss.extract_index_ivf(index).nprobe = config.nprobe
+    elif config.index_type == "hnsw":
+        index.hnsw.efSearch = config.ef_search
+
+
+def sample_rows(chunks: Iterable[np.ndarray], n: int, sample_size: int, seed: int = 1234) -> np.ndarray:
+    """Random rows picked in one streaming pass (the full matrix is never materialized)"""
+    rng = np.random.default_rng(seed)
+    wanted = np.sort(rng.choice(n, min(sample_size, n), replace=False))
+    picked, offset = [], 0
+    for chunk in chunks:
+        lo, hi = np.searchsorted(wanted, [offset, offset + len(chunk)])
+        if hi > lo:
+            picked.append(np.asarray(chunk)[wanted[lo:hi] - offset])
+        offset += len(chunk)
+    return np.ascontiguousarray(np.vstack(picked), dtype="float32")
+
+
+def build_ann_index(config, dimension: int, chunk_source: Callable[[], Iterable[np.ndarray]], n: int) -> faiss.Index:
+    """
+    Build (train + fill) the configured ANN index. chunk_source() must yield
+    all vectors in id order, so ANN ids line up with the flat store's row ids.
+    """
+    index = faiss.index_factory(dimension, index_factory_string(config, n), faiss_metric(config.metric))
+    if config.index_type == "hnsw":
+        index.hnsw.efConstruction = config.ef_construction
+
+    if not index.is_trained:
+        # faiss wants roughly 30-256 training points per IVF list
+        nlist = faiss.extract_index_ivf(index).nlist
+        index.train(sample_rows(chunk_source(), n, max(nlist * 64, 10000)))
+
+    for chunk in chunk_source():
+        index.add(np.ascontiguousarray(chunk, dtype="float32"))
+    configure_search(index, config)
+    return index
@@ -0,0 +1,89 @@
+"""
+Recall vs latency of the ANN index types against the exact flat baseline.
+
+    python -m vectordb.benchmark --n 200000 --queries 1000 --k 10
+    python -m vectordb.benchmark --embeddings ./data/faiss_index/checkpoint-000003/embeddings.npy
+
+Without --embeddings, clustered synthetic vectors are used (uniform random
+vectors make every ANN index look bad and are nothing like sentence embeddings).
+"""
+import argparse
+import copy
+import time
+import faiss
+import numpy as np
+from vectordb.ann import ANN_INDEX_TYPES, build_ann_index, faiss_metric
+from vectordb.config import vectordb_config
+
+
+def synthetic_embeddings(n: int, dimension: int, clusters: int = 256, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dimension)).astype("float32")
+    labels = rng.integers(0, clusters, n)
+    vectors = centers[labels] + 0.35 * rng.standard_normal((n, dimension)).astype("float32")
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def time_queries(index: faiss.Index, queries: np.ndarray, k: int):
+    latencies, results = [], []
+    for q in queries:
+        started = time.perf_counter()
+        _, ids = index.search(q.reshape(1, -1), k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        results.append(ids[0])
+    return np.array(results), np.array(latencies)
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(f[f >= 0]) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--embeddings", help=".npy file with stored embeddings (default: synthetic)")
+    parser.add_argument("--n", type=int, default=100000, help="synthetic corpus size")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--types", default=",".join(ANN_INDEX_TYPES))
+    parser.add_argument("--metric", default=vectordb_config.metric)
+    args = parser.parse_args()
+
+    if args.embeddings:
+        vectors = np.ascontiguousarray(np.load(args.embeddings), dtype="float32")
+    else:
+        vectors = synthetic_embeddings(args.n, vectordb_config.dimension)
+    n, dimension = vectors.shape
+
+    # Queries: perturbed copies of stored vectors, kept out of the corpus statistics
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.choice(n, args.queries, replace=False)].copy()
+    queries += 0.05 * rng.standard_normal(queries.shape).astype("float32")
+    if args.metric == "cosine":
+        faiss.normalize_L2(queries)
+
+    flat = faiss.IndexFlat(dimension, faiss_metric(args.metric))
+    flat.add(vectors)
+    truth, flat_latency = time_queries(flat, queries, args.k)
+
+    print(f"n={n} dim={dimension} queries={args.queries} k={args.k} metric={args.metric}")
+    print(f"{'index':<10} {'build s':>8} {'recall@k':>9} {'mean ms':>8} {'p95 ms':>8}")
+    print(f"{'flat':<10} {0.0:>8.2f} {1.0:>9.3f} {flat_latency.mean():>8.3f} {np.percentile(flat_latency, 95):>8.3f}")
+
+    for index_type in [t.strip() for t in args.types.split(",") if t.strip()]:
+        config = copy.copy(vectordb_config)
+        config.index_type = index_type
+        config.metric = args.metric
+        started = time.perf_counter()
+        index = build_ann_index(config, dimension, lambda: [vectors], n)
+        build_seconds = time.perf_counter() - started
+        found, latency = time_queries(index, queries, args.k)
+        print(
+            f"{index_type:<10} {build_seconds:>8.2f} {recall_at_k(found, truth):>9.3f} "
+            f"{latency.mean():>8.3f} {np.percentile(latency, 95):>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,16 @@
 import os
 import faiss
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from typing import List, Tuple, Optional
-import pickle
+import time
+import threading
+from contextlib import contextmanager
 from pathlib import Path
+from vectordb.storage import DocumentTable, SegmentLogStorage
+from vectordb.ann import ANN_INDEX_TYPES, build_ann_index, faiss_metric, similarity_to_distance
+from vectordb.filters import AttributeIndex, TimeBound
+from vectordb.embedding_cache import EmbeddingCache, content_hash
+from vectordb.embeddings import create_embedding_backend
 
 class VectorDBConfig:
     """Configuration for FAISS Vector Database"""
@@ -12,8 +18,63 @@ class VectorDBConfig:
     def __init__(self):
         self.enabled = os.getenv("VECTORDB_ENABLED", "false").lower() == "true"
         self.index_path = os.getenv("FAISS_INDEX_PATH", "./data/faiss_index")
+        # "<model>" (sentence-transformers) or "<backend>:<model>" with backend one of
+        # st, st-int8, onnx, onnx-int8 - see vectordb/embeddings.py
         self.embedding_model_name = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+        self.embedding_cache_dir = os.getenv("EMBEDDING_CACHE_DIR", "./data/models")  # int8 ONNX exports
+        self.embedding_threads = int(os.getenv("EMBEDDING_THREADS", "0"))  # 0 = runtime default
         self.dimension = 384  # Dimension for all-MiniLM-L6-v2
+
+        # Background ingestion (embedding + index writes happen off the event loop)
+        self.ingest_batch_size = int(os.getenv("VECTORDB_INGEST_BATCH_SIZE", "64"))
+        self.ingest_flush_interval = float(os.getenv("VECTORDB_INGEST_FLUSH_INTERVAL", "0.05"))
+        self.ingest_queue_size = int(os.getenv("VECTORDB_INGEST_QUEUE_SIZE", "10000"))
+
+        # Persistence: append-only segment log, full checkpoint every N appended records
+        self.compact_every = int(os.getenv("VECTORDB_COMPACT_EVERY", "10000"))
+        self.fsync = os.getenv("VECTORDB_FSYNC", "true").lower() == "true"
+
+        # "memory": load everything into RAM, "mmap": memory-map checkpointed vectors and
+        # documents so workers on one host share pages and documents are decoded lazily
+        self.load_mode = os.getenv("VECTORDB_LOAD_MODE", "memory").lower()
+        # Workers sharing the index path: seconds between checks for the others' writes before a search
+        self.refresh_interval = float(os.getenv("VECTORDB_REFRESH_INTERVAL", "1.0"))
+
+        # Index type: "flat" (exact), or an ANN index built in the background once the
+        # corpus reaches ann_threshold vectors: "ivf_flat", "hnsw", "ivf_pq"
+        self.index_type = os.getenv("VECTORDB_INDEX_TYPE", "flat").lower()
+        self.metric = os.getenv("VECTORDB_METRIC", "l2").lower()  # "l2", "cosine" or "ip"
+        self.ann_threshold = int(os.getenv("VECTORDB_ANN_THRESHOLD", "50000"))
+        self.ann_rebuild_growth = float(os.getenv("VECTORDB_ANN_REBUILD_GROWTH", "2.0"))  # retrain IVF when corpus grows by this factor
+        self.ivf_nlist = int(os.getenv("VECTORDB_IVF_NLIST", "0"))  # 0 = 4 * sqrt(n)
+        self.nprobe = int(os.getenv("VECTORDB_NPROBE", "16"))
+        self.pq_m = int(os.getenv("VECTORDB_PQ_M", "48"))
+        self.hnsw_m = int(os.getenv("VECTORDB_HNSW_M", "32"))
+        self.ef_construction = int(os.getenv("VECTORDB_EF_CONSTRUCTION", "80"))
+        self.ef_search = int(os.getenv("VECTORDB_EF_SEARCH", "64"))
+
+        # Filtered search: candidate sets up to this size are scanned exactly,
+        # larger ones go through the ANN index with an ID selector
+        self.filter_exact_max = int(os.getenv("VECTORDB_FILTER_EXACT_MAX", "50000"))
+
+        # Embedding cache shared by search and ingest (0 disables), saved next to the index
+        self.embedding_cache_size = int(os.getenv("VECTORDB_EMBEDDING_CACHE_SIZE", "10000"))
+        self.embedding_cache_persist = os.getenv("VECTORDB_EMBEDDING_CACHE_PERSIST", "true").lower() == "true"
+        # Store a repeated (session, text) pair once and count its occurrences
+        self.dedup = os.getenv("VECTORDB_DEDUP", "true").lower() == "true"
+
+        # Housekeeping: drop vectors older than retention_days (0 = keep forever), and
+        # compact (checkpoint without deleted rows) once tombstones reach compact_fraction
+        # of the corpus (at least compact_min_tombstones), and always at max_tombstones
+        self.retention_days = float(os.getenv("VECTORDB_RETENTION_DAYS", "0"))
+        self.max_tombstones = int(os.getenv("VECTORDB_MAX_TOMBSTONES", "5000"))
+        self.compact_fraction = float(os.getenv("VECTORDB_COMPACT_FRACTION", "0.2"))
+        self.compact_min_tombstones = int(os.getenv("VECTORDB_COMPACT_MIN_TOMBSTONES", "100"))
+        self.housekeeping_interval = float(os.getenv("VECTORDB_HOUSEKEEPING_INTERVAL", "3600"))
+
+        # Load the model + index on a background thread at startup; when false the
+        # load starts on first use instead. Vector context is skipped until it is ready.
+        self.warmup_on_startup = os.getenv("VECTORDB_WARMUP_ON_STARTUP", "true").lower() == "true"
         
         # Create directory if it doesn't exist
         Path(self.index_path).parent.mkdir(parents=True, exist_ok=True)
@@ -26,112 +87,568 @@ class FAISSVectorStore:
     
     def __init__(self, config: VectorDBConfig):
         self.config = config
-        self.model = SentenceTransformer(config.embedding_model_name)
+        self.embedder = create_embedding_backend(
+            config.embedding_model_name, cache_dir=config.embedding_cache_dir, threads=config.embedding_threads
+        )
+        if self.embedder.dimension != config.dimension:
+            raise ValueError(
+                f"EMBEDDING_MODEL '{config.embedding_model_name}' produces {self.embedder.dimension}-d vectors, "
+                f"the index expects {config.dimension}"
+            )
+        self.embedding_cache = EmbeddingCache(
+            max_size=config.embedding_cache_size,
+            path=str(Path(config.index_path) / "embedding_cache.npz") if config.embedding_cache_persist else None,
+            signature=f"{config.embedding_model_name}:{config.metric}",
+        )
+        self.duplicates_skipped = 0
+        self.deleted = 0
+        self.compactions = 0
         self.index = None
-        self.documents = []
-        self.metadata = []
+        self.documents = DocumentTable()
+        self.attributes = AttributeIndex()
+        # mmap mode: checkpointed vectors stay on disk (ids 0..base_count-1),
+        # self.index only holds vectors added since the checkpoint
+        self.base_vectors: Optional[np.ndarray] = None
+        self.base_count = 0
+        # Optional ANN index over the same row ids, built/rebuilt on a background thread
+        self.ann = None
+        self.ann_trained_size = 0
+        self._ann_thread: Optional[threading.Thread] = None
+        self._epoch = 0  # bumped by clear() so a build started before it is discarded
+        # Ingestion runs on a worker thread while searches run elsewhere
+        self._lock = threading.RLock()
+        # Held while catching up with the shared storage or writing to it (see _writing)
+        self._sync_lock = threading.RLock()
+        self._synced_at = 0.0
         
         # Initialize or load index
         self._initialize_index()
     
+    @property
+    def mmap_mode(self) -> bool:
+        return self.config.load_mode == "mmap"
+
+    def _new_flat_index(self) -> faiss.Index:
+        if self.config.metric == "l2":
+            return faiss.IndexFlatL2(self.config.dimension)
+        return faiss.IndexFlatIP(self.config.dimension)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embeddings in this store's space, through the shared embedding cache"""
+        return self._encode(texts)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return self.embedding_cache.encode(texts, self._encode_uncached)
+
+    def _encode_uncached(self, texts: List[str]) -> np.ndarray:
+        embeddings = self.embedder.encode(texts)
+        if self.config.metric == "cosine":
+            faiss.normalize_L2(embeddings)
+        return embeddings
+
+    def _to_distances(self, scores: np.ndarray) -> np.ndarray:
+        """Lower is better for every metric (see similarity_to_distance)"""
+        return scores if self.config.metric == "l2" else similarity_to_distance(scores)
+
     def _initialize_index(self):
-        """Initialize or load existing FAISS index"""
-        index_file = f"{self.config.index_path}/index.faiss"
-        docs_file = f"{self.config.index_path}/documents.pkl"
-        meta_file = f"{self.config.index_path}/metadata.pkl"
-        
-        if os.path.exists(index_file):
-            # Load existing index
-            self.index = faiss.read_index(index_file)
-            
-            if os.path.exists(docs_file):
-                with open(docs_file, 'rb') as f:
-                    self.documents = pickle.load(f)
-            
-            if os.path.exists(meta_file):
-                with open(meta_file, 'rb') as f:
-                    self.metadata = pickle.load(f)
-        else:
-            # Create new index
-            self.index = faiss.IndexFlatL2(self.config.dimension)
+        """Initialize or load existing FAISS index (checkpoint + segment log replay)"""
+        self.storage = SegmentLogStorage(
+            self.config.index_path,
+            self.config.dimension,
+            compact_every=self.config.compact_every,
+            fsync=self.config.fsync,
+        )
+        # Under the writer lock, so a torn tail or abandoned generation is really abandoned
+        with self._sync_lock, self.storage.writer():
+            self._reload()
+
+    def _reload(self):
+        """Rebuild the in-memory state from storage (after a compaction, ours or another worker's)"""
+        base, documents, appended, attributes = self.storage.load(mmap_mode=self.mmap_mode)
+        index = self._new_flat_index()
+        base_vectors, base_count = None, 0
+        if base is not None and len(base):
+            if self.mmap_mode:
+                base_vectors, base_count = base, len(base)
+            else:
+                index.add(np.ascontiguousarray(base, dtype='float32'))
+        if appended is not None:
+            index.add(appended)
+
+        with self._lock:
+            old_documents = self.documents
+            self.index = index
+            self.base_vectors, self.base_count = base_vectors, base_count
+            self.documents = documents
+            self.attributes = attributes
+            # Row ids may have changed: the ANN index is rebuilt from scratch
+            self._epoch += 1
+            self.ann = None
+            self.ann_trained_size = 0
+        old_documents.close()
+        self._maybe_build_ann()
+
+    def _sync(self):
+        """Catch up with what other workers wrote to the shared index path (caller holds _sync_lock)"""
+        change = self.storage.poll()
+        if change == "reload":
+            self._reload()
+        elif change == "tail":
+            with self._lock:
+                appended = self.storage.replay_tail(self.documents, self.attributes)
+                if appended is not None:
+                    self.index.add(appended)
+                    if self.ann is not None:
+                        self.ann.add(appended)
+
+    def _maybe_sync(self):
+        """Before a search: catch up at most every refresh_interval, never waiting behind a write"""
+        now = time.monotonic()
+        if now - self._synced_at < self.config.refresh_interval or not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            self._synced_at = now
+            self._sync()
+        except Exception as e:
+            print(f"Vector store: refresh from disk failed, searching the previous state: {e}")
+        finally:
+            self._sync_lock.release()
+
+    @contextmanager
+    def _writing(self):
+        """
+        Exclusive write access: one thread here, one process across the workers
+        sharing the index path (fcntl lock), and caught up with their writes so
+        row and document ids line up with the shared log.
+        """
+        with self._sync_lock, self.storage.writer():
+            self._sync()
+            yield
+
+    @property
+    def ntotal(self) -> int:
+        return self.base_count + (self.index.ntotal if self.index else 0)
     
     def add_documents(self, texts: List[str], metadata_list: List[dict] = None):
-        """Add documents to the vector store"""
+        """Add documents to the vector store (repeats of a stored session message only bump its count)"""
         if not texts:
             return
+        if not metadata_list:
+            metadata_list = [{} for _ in texts]
+        if self.config.dedup:
+            metadata_list = [dict(meta, content_hash=content_hash(text)) for text, meta in zip(texts, metadata_list)]
         
-        # Generate embeddings
-        embeddings = self.model.encode(texts, convert_to_numpy=True)
-        
-        # Add to FAISS index
-        self.index.add(embeddings.astype('float32'))
-        
-        # Store documents and metadata
-        self.documents.extend(texts)
-        if metadata_list:
-            self.metadata.extend(metadata_list)
-        else:
-            self.metadata.extend([{} for _ in texts])
+        # Generate embeddings (cached texts and in-batch repeats are not re-encoded)
+        embeddings = self._encode(texts)
         
-        # Save index
-        self._save_index()
+        touches = []
+        with self._writing():
+            with self._lock:
+                if self.config.dedup:
+                    new_rows, seen = [], {}
+                    for i, meta in enumerate(metadata_list):
+                        key = (meta.get("session_id"), meta["content_hash"])
+                        row = self.attributes.find(*key)
+                        if row is None:
+                            row = seen.get(key)
+                        if row is None:
+                            seen[key] = self.ntotal + len(new_rows)
+                            new_rows.append(i)
+                        else:
+                            touches.append((row, meta.get("timestamp")))
+                    texts = [texts[i] for i in new_rows]
+                    metadata_list = [metadata_list[i] for i in new_rows]
+                    embeddings = embeddings[new_rows]
+                    self.duplicates_skipped += len(touches)
+
+                # Stable ids for the log's touch / delete records (row ids change at compaction)
+                first_id = self.attributes.next_id
+                metadata_list = [dict(meta, doc_id=first_id + i) for i, meta in enumerate(metadata_list)]
+
+                # Add to FAISS index
+                if texts:
+                    self.index.add(embeddings)
+                    if self.ann is not None:
+                        self.ann.add(embeddings)
+            
+                # Store documents and metadata
+                self.documents.append(texts, metadata_list)
+                self.attributes.append(metadata_list)
+                for row, timestamp in touches:
+                    self.attributes.touch(row, timestamp)
+                touched_ids = self.attributes.ids_of(row for row, _ in touches)
+
+            # Persist only this batch, fold the log into a checkpoint now and then
+            self.storage.append(
+                embeddings, texts, metadata_list, [(doc_id, ts) for doc_id, (_, ts) in zip(touched_ids, touches)]
+            )
+            if self.storage.needs_compaction():
+                self._save_index()
+        self._maybe_build_ann()
     
-    def search(self, query: str, k: int = 5) -> List[Tuple[str, float, dict]]:
-        """Search for similar documents"""
-        if self.index.ntotal == 0:
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        session_id: Optional[str] = None,
+        since: TimeBound = None,
+        until: TimeBound = None,
+        role: Optional[str] = None,
+    ) -> List[Tuple[str, float, dict]]:
+        """Search for similar documents, optionally restricted to a session, a time window and/or a role"""
+        self._maybe_sync()
+        if self.ntotal == 0:
             return []
         
         # Generate query embedding
-        query_embedding = self.model.encode([query], convert_to_numpy=True)
-        
-        # Search
-        distances, indices = self.index.search(query_embedding.astype('float32'), k)
+        query_embedding = self._encode([query])
         
-        # Format results
-        results = []
-        for idx, distance in zip(indices[0], distances[0]):
-            if idx < len(self.documents):
-                results.append((
-                    self.documents[idx],
-                    float(distance),
-                    self.metadata[idx] if idx < len(self.metadata) else {}
-                ))
+        with self._lock:
+            candidates = self.attributes.candidates(session_id, since, until, role)
+            if candidates is None:
+                hits = self._search_all(query_embedding, k)
+            elif len(candidates) == 0:
+                hits = []
+            else:
+                hits = self._search_subset(query_embedding, k, candidates)
+            
+            # Format results
+            results = []
+            for distance, idx in hits:
+                if idx < len(self.documents):
+                    text, meta = self.documents.get(idx)
+                    results.append((text, distance, dict(meta, occurrences=self.attributes.occurrences(idx))))
         
         return results
+
+    def _ann_params(self, selector):
+        if self.config.index_type == "hnsw":
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=self.config.ef_search)
+        return faiss.SearchParametersIVF(sel=selector, nprobe=self.config.nprobe)
+
+    def _search_all(self, query_embedding: np.ndarray, k: int) -> List[Tuple[float, int]]:
+        tombstones = self.attributes.tombstones
+        if self.ann is not None:
+            # Approximate search, already covers every row id
+            if tombstones:
+                deleted = self.attributes.deleted_rows()
+                batch = faiss.IDSelectorBatch(len(deleted), faiss.swig_ptr(deleted))
+                selector = faiss.IDSelectorNot(batch)
+                scores, indices = self.ann.search(query_embedding, k, params=self._ann_params(selector))
+            else:
+                scores, indices = self.ann.search(query_embedding, k)
+            return [(float(d), int(i)) for d, i in zip(self._to_distances(scores)[0], indices[0]) if i >= 0]
+
+        if tombstones:
+            # Over-fetch past the deleted rows (bounded by max_tombstones, see delete())
+            deleted = self.attributes.deleted_col.values
+            hits = self._search_exact(query_embedding, k + tombstones)
+            return [(d, i) for d, i in hits if not deleted[i]][:k]
+        return self._search_exact(query_embedding, k)
+
+    def _search_exact(self, query_embedding: np.ndarray, k: int) -> List[Tuple[float, int]]:
+        k = min(k, self.ntotal)
+        scores, indices = self.index.search(query_embedding, k)
+        hits = [(float(d), int(i) + self.base_count) for d, i in zip(self._to_distances(scores)[0], indices[0]) if i >= 0]
+
+        if self.base_count:
+            # Brute-force scan straight over the memory-mapped checkpoint (no copy into RAM)
+            base_scores, base_indices = faiss.knn(
+                query_embedding, self.base_vectors, min(k, self.base_count), faiss_metric(self.config.metric)
+            )
+            hits += [(float(d), int(i)) for d, i in zip(self._to_distances(base_scores)[0], base_indices[0]) if i >= 0]
+            hits = sorted(hits)[:k]
+        return hits
+
+    def _search_subset(self, query_embedding: np.ndarray, k: int, candidates: np.ndarray) -> List[Tuple[float, int]]:
+        """Top-k among the candidate row ids only (rows outside the filter can never be returned)"""
+        if self.ann is not None and len(candidates) > self.config.filter_exact_max:
+            candidates = np.ascontiguousarray(candidates, dtype="int64")
+            selector = faiss.IDSelectorBatch(len(candidates), faiss.swig_ptr(candidates))
+            scores, indices = self.ann.search(query_embedding, k, params=self._ann_params(selector))
+        else:
+            # Small candidate set: exact scan over just those vectors, cheaper than a global search
+            scores, local = faiss.knn(
+                query_embedding, self._gather(candidates), min(k, len(candidates)), faiss_metric(self.config.metric)
+            )
+            indices = np.where(local >= 0, candidates[np.maximum(local, 0)], -1)
+        return [(float(d), int(i)) for d, i in zip(self._to_distances(scores)[0], indices[0]) if i >= 0]
+
+    def _gather(self, ids: np.ndarray) -> np.ndarray:
+        """Vectors for the given row ids (caller holds the lock)"""
+        vectors = np.empty((len(ids), self.config.dimension), dtype="float32")
+        in_base = ids < self.base_count
+        if in_base.any():
+            vectors[in_base] = self.base_vectors[ids[in_base]]
+        if (~in_base).any():
+            # Zero-copy view of the flat index's storage
+            flat = faiss.rev_swig_ptr(self.index.get_xb(), self.index.ntotal * self.config.dimension)
+            vectors[~in_base] = flat.reshape(-1, self.config.dimension)[ids[~in_base] - self.base_count]
+        return vectors
+
+    def _embedding_chunks(self, start: int = 0, stop: Optional[int] = None, chunk_size: int = 65536):
+        """Stored vectors with ids in [start, stop), in id order, a chunk at a time"""
+        stop = self.ntotal if stop is None else stop
+        lo = start
+        while lo < stop:
+            # Row ids are stable across checkpoints, but where a row lives (mmapped base or
+            # in-RAM delta) is not, so resolve each chunk under the lock
+            with self._lock:
+                hi = min(lo + chunk_size, stop)
+                if lo < self.base_count:
+                    hi = min(hi, self.base_count)
+                    chunk = np.asarray(self.base_vectors[lo:hi])
+                else:
+                    chunk = self.index.reconstruct_n(lo - self.base_count, hi - lo)
+            yield chunk
+            lo = hi
+
+    # ======================================================
+    #   DELETION / RETENTION
+    # ======================================================
+    def delete(
+        self,
+        session_id: Optional[str] = None,
+        since: TimeBound = None,
+        until: TimeBound = None,
+        role: Optional[str] = None,
+    ) -> int:
+        """
+        Delete every row matching the filters (at least one is required).
+        Rows are tombstoned and logged right away, search skips them, and the
+        next checkpoint drops them for good. Returns the number of rows deleted.
+        """
+        if session_id is None and since is None and until is None and role is None:
+            raise ValueError("delete() needs at least one filter, use clear() to drop everything")
+        with self._writing():
+            with self._lock:
+                rows = self.attributes.candidates(session_id, since, until, role)
+                deleted = self.attributes.delete(rows)
+                self.deleted += deleted
+                doc_ids = self.attributes.ids_of(rows)
+            if not deleted:
+                return 0
+            self.storage.delete(doc_ids.tolist())
+            if self._too_many_tombstones() or self.storage.needs_compaction():
+                self._save_index()
+        return deleted
+
+    def purge_session(self, session_id: str) -> int:
+        """Delete everything stored for one session"""
+        return self.delete(session_id=session_id)
+
+    def expire(self, max_age_days: Optional[float] = None) -> int:
+        """Delete rows older than max_age_days (defaults to VECTORDB_RETENTION_DAYS, 0 = keep forever)"""
+        max_age_days = self.config.retention_days if max_age_days is None else max_age_days
+        if max_age_days <= 0:
+            return 0
+        return self.delete(until=time.time() - max_age_days * 86400)
+
+    def housekeeping(self) -> dict:
+        """Periodic maintenance: age-based retention, then compaction if deletions piled up"""
+        with self._writing():
+            expired = self.expire()
+            # A compaction rewrites the whole corpus: not worth it for a handful of deletes
+            compacted = self._too_many_tombstones()
+            if compacted:
+                self._save_index()
+        return {"expired": expired, "compacted": compacted}
+
+    def _too_many_tombstones(self) -> bool:
+        """Tombstones past the compaction threshold (max_tombstones also bounds search over-fetch)"""
+        threshold = max(self.config.compact_min_tombstones, self.config.compact_fraction * self.ntotal)
+        return self.attributes.tombstones >= max(1, min(self.config.max_tombstones, threshold))
+
+    def _row_chunks(self, rows: np.ndarray, chunk_size: int = 65536):
+        """Vectors of the given row ids, in order, a chunk at a time"""
+        for lo in range(0, len(rows), chunk_size):
+            with self._lock:
+                chunk = self._gather(rows[lo:lo + chunk_size])
+            yield chunk
+
+    def _compact(self):
+        """
+        Checkpoint only the live rows (row ids are renumbered), then reload from
+        that checkpoint. Runs on the writer thread: concurrent searches keep
+        using the old state until the swap at the end.
+        """
+        started = time.perf_counter()
+        with self._lock:
+            live = self.attributes.live_rows()
+            attributes = self.attributes.subset(live)
+        documents = (self.documents.get(int(row)) for row in live)
+        self.storage.write_checkpoint(self._row_chunks(live), len(live), documents, attributes)
+        self._reload()
+        self.compactions += 1
+        print(f"Vector store: compacted to {len(live)} rows in {time.perf_counter() - started:.1f}s")
+
+    # ======================================================
+    #   ANN INDEX (background build / rebuild)
+    # ======================================================
+    def _maybe_build_ann(self):
+        if self.config.index_type not in ANN_INDEX_TYPES:
+            return
+        if self._ann_thread is not None and self._ann_thread.is_alive():
+            return
+        n = self.ntotal
+        if self.ann is None:
+            needed = n >= self.config.ann_threshold
+        else:
+            # IVF centroids go stale as the corpus grows, HNSW just keeps inserting
+            needed = self.config.index_type != "hnsw" and n >= self.ann_trained_size * self.config.ann_rebuild_growth
+        if needed:
+            self._ann_thread = threading.Thread(target=self._build_ann, name="vector-ann-build", daemon=True)
+            self._ann_thread.start()
+
+    def _build_ann(self):
+        try:
+            epoch, n = self._epoch, self.ntotal
+            started = time.perf_counter()
+            ann = build_ann_index(
+                self.config, self.config.dimension, lambda: self._embedding_chunks(0, n), n
+            )
+            with self._lock:
+                if epoch != self._epoch:
+                    return
+                # Catch up with rows added while training
+                for chunk in self._embedding_chunks(n):
+                    ann.add(np.ascontiguousarray(chunk, dtype='float32'))
+                self.ann = ann
+                self.ann_trained_size = n
+            print(f"Vector store: {self.config.index_type} index built over {n} vectors in {time.perf_counter() - started:.1f}s")
+        except Exception as e:
+            print(f"Vector store: ANN build failed, staying on exact search: {e}")
     
     def _save_index(self):
-        """Save FAISS index and documents to disk"""
-        index_file = f"{self.config.index_path}/index.faiss"
-        docs_file = f"{self.config.index_path}/documents.pkl"
-        meta_file = f"{self.config.index_path}/metadata.pkl"
-        
-        # Save FAISS index
-        faiss.write_index(self.index, index_file)
-        
-        # Save documents
-        with open(docs_file, 'wb') as f:
-            pickle.dump(self.documents, f)
-        
-        # Save metadata
-        with open(meta_file, 'wb') as f:
-            pickle.dump(self.metadata, f)
+        """Write a full checkpoint of the index, documents and metadata (atomic)"""
+        if self.attributes.tombstones:
+            self._compact()
+            self.embedding_cache.save()
+            return
+        self.storage.write_checkpoint(self._embedding_chunks(), self.ntotal, self.documents, self.attributes)
+        if self.mmap_mode:
+            # Swap the in-RAM delta for the freshly written checkpoint files
+            base, documents, _, _ = self.storage.load(mmap_mode=True)
+            with self._lock:
+                old_documents = self.documents
+                self.base_vectors = base if base is not None and len(base) else None
+                self.base_count = len(base) if self.base_vectors is not None else 0
+                self.documents = documents
+                self.index.reset()
+            old_documents.close()
+        self.embedding_cache.save()
     
     def get_stats(self) -> dict:
         """Get statistics about the vector store"""
         return {
-            "total_documents": self.index.ntotal if self.index else 0,
+            "total_documents": self.ntotal,
             "dimension": self.config.dimension,
             "model": self.config.embedding_model_name,
-            "index_type": "FAISS IndexFlatL2"
+            "embedding_backend": self.embedder.name,
+            "index_type": self.config.index_type if self.ann is not None else f"flat ({self.config.metric})",
+            "metric": self.config.metric,
+            "ann_ready": self.ann is not None,
+            "ann_trained_size": self.ann_trained_size,
+            "load_mode": self.config.load_mode,
+            "live_documents": self.ntotal - self.attributes.tombstones,
+            "tombstones": self.attributes.tombstones,
+            "deleted": self.deleted,
+            "compactions": self.compactions,
+            "retention_days": self.config.retention_days,
+            "duplicates_skipped": self.duplicates_skipped,
+            "embedding_cache": self.embedding_cache.get_stats(),
+            "storage": self.storage.get_stats()
         }
     
     def clear(self):
         """Clear all documents from the vector store"""
-        self.index = faiss.IndexFlatL2(self.config.dimension)
-        self.documents = []
-        self.metadata = []
-        self._save_index()
+        with self._writing(), self._lock:
+            self.index = self._new_flat_index()
+            self._epoch += 1
+            self.ann = None
+            self.ann_trained_size = 0
+            self.base_vectors = None
+            self.base_count = 0
+            self.documents.close()
+            self.documents = DocumentTable()
+            self.attributes = AttributeIndex()
+            self._save_index()
+
+
+class VectorStoreLoader:
+    """
+    Builds the global FAISSVectorStore on a background thread, so importing
+    this module (and starting the API) never waits for the model or index load.
+    """
+
+    def __init__(self, config: VectorDBConfig):
+        self.config = config
+        self.store: Optional[FAISSVectorStore] = None
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.enabled
+
+    @property
+    def ready(self) -> bool:
+        return self.store is not None
+
+    def start(self):
+        """Kick off the background load (no-op if disabled or already started)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._load, name="vector-store-warmup", daemon=True)
+                self._thread.start()
+
+    def _load(self):
+        started = time.perf_counter()
+        try:
+            store = FAISSVectorStore(self.config)
+            # First encode() call is much slower than the rest, get it out of the way now
+            store._encode_uncached(["warm up"])
+            self.store = store
+            self.load_seconds = round(time.perf_counter() - started, 2)
+            print(f"Vector store ready in {self.load_seconds}s ({store.ntotal} documents)")
+        except Exception as e:
+            self.error = str(e)
+            print(f"Vector store failed to load, vector context disabled: {e}")
+        finally:
+            self._done.set()
+
+    def get(self) -> Optional[FAISSVectorStore]:
+        """The store if it is ready, None otherwise (never blocks, starts a lazy load)"""
+        if self.store is None:
+            self.start()
+        return self.store
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[FAISSVectorStore]:
+        """Block until the load has finished (for worker threads), None if disabled or failed"""
+        if not self.enabled:
+            return None
+        self.start()
+        self._done.wait(timeout)
+        return self.store
+
+    def get_status(self) -> dict:
+        if not self.enabled:
+            state = "disabled"
+        elif self.store is not None:
+            state = "ready"
+        elif self.error is not None:
+            state = "failed"
+        elif self._thread is None:
+            state = "not_started"
+        else:
+            state = "loading"
+        return {"state": state, "load_seconds": self.load_seconds, "error": self.error}
 
 
-# Global vector store instance
-vector_store = FAISSVectorStore(vectordb_config) if vectordb_config.enabled else None
\ No newline at end of file
+# Global vector store, loaded in the background (see VectorStoreLoader)
+vector_store_loader = VectorStoreLoader(vectordb_config)
\ No newline at end of file
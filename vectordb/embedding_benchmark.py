@@ -0,0 +1,106 @@
+"""
+Throughput and retrieval parity of the embedding backends against the
+current full-precision sentence-transformers encoder.
+
+    python -m vectordb.embedding_benchmark
+    python -m vectordb.embedding_benchmark --backends st,st-int8,onnx,onnx-int8 --n 1500 --batch-size 64
+
+Parity is reported as the mean cosine between each backend's embedding and
+the reference embedding of the same text, and as recall@k of the
+reference's nearest neighbours when searching with the backend's vectors.
+"""
+import argparse
+import itertools
+import time
+import faiss
+import numpy as np
+from vectordb.config import vectordb_config
+from vectordb.embeddings import EMBEDDING_BACKENDS, create_embedding_backend, parse_model_spec
+
+CITIES = [
+    "London", "Paris", "Dhaka", "Tokyo", "New York", "Berlin", "Sydney", "Cairo", "Toronto", "Mumbai",
+    "Chittagong", "Madrid", "Rome", "Nairobi", "Lima", "Seoul", "Oslo", "Dubai", "Chicago", "Lagos",
+]
+PHRASES = [
+    "what's the weather in {city}",
+    "weather in {city}",
+    "will it rain in {city} tomorrow",
+    "5 day forecast for {city}",
+    "is it cold in {city} right now",
+    "should I take an umbrella in {city}",
+    "how hot will it get in {city} this week",
+    "is it windy in {city}",
+    "what should I wear in {city} today",
+    "any storms expected near {city}",
+]
+SUFFIXES = ["", " please", "?", " today", " tonight", " this weekend", " thanks", " asap"]
+
+
+def synthetic_messages(n: int, seed: int = 0):
+    """Distinct short chat messages shaped like what users actually send"""
+    pool = [p.format(city=c) + s for p, c, s in itertools.product(PHRASES, CITIES, SUFFIXES)]
+    rng = np.random.default_rng(seed)
+    return [pool[i] for i in rng.permutation(len(pool))[:n]]
+
+
+def throughput(backend, texts, batch_size: int) -> float:
+    backend.encode(texts[:batch_size])  # warm-up
+    started = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        backend.encode(texts[i:i + batch_size])
+    return len(texts) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=parse_model_spec(vectordb_config.embedding_model_name)[1])
+    parser.add_argument("--backends", default=",".join(EMBEDDING_BACKENDS))
+    parser.add_argument("--n", type=int, default=1000, help="number of messages to encode (max 1600)")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    texts = synthetic_messages(args.n)
+    # Queries are real messages too, encoded by each backend like the search path does
+    queries = synthetic_messages(args.queries, seed=1)
+
+    reference = create_embedding_backend(f"st:{args.model}", cache_dir=vectordb_config.embedding_cache_dir)
+    ref_corpus = reference.encode(texts)
+    faiss.normalize_L2(ref_corpus)
+    ref_index = faiss.IndexFlatIP(ref_corpus.shape[1])
+    ref_index.add(ref_corpus)
+    ref_queries = reference.encode(queries)
+    faiss.normalize_L2(ref_queries)
+    _, truth = ref_index.search(ref_queries, args.k)
+
+    print(f"model={args.model} n={args.n} batch={args.batch_size} queries={args.queries} k={args.k}")
+    print(f"{'backend':<10} {'texts/s':>9} {'speedup':>8} {'mean cos':>9} {'recall@k':>9}")
+    baseline = None
+    for name in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        try:
+            backend = reference if name == "st" else create_embedding_backend(
+                f"{name}:{args.model}", cache_dir=vectordb_config.embedding_cache_dir
+            )
+        except ImportError as e:
+            print(f"{name:<10} skipped ({e})")
+            continue
+        rate = throughput(backend, texts, args.batch_size)
+        baseline = baseline or (rate if name == "st" else None)
+
+        corpus = backend.encode(texts)
+        faiss.normalize_L2(corpus)
+        mean_cos = float(np.mean(np.sum(corpus * ref_corpus, axis=1)))
+        index = faiss.IndexFlatIP(corpus.shape[1])
+        index.add(corpus)
+        found_queries = backend.encode(queries)
+        faiss.normalize_L2(found_queries)
+        _, found = index.search(found_queries, args.k)
+        recall = sum(len(set(f) & set(t)) for f, t in zip(found, truth)) / truth.size
+
+        speedup = f"{rate / baseline:>7.2f}x" if baseline else f"{'-':>8}"
+        print(f"{name:<10} {rate:>9.0f} {speedup} {mean_cos:>9.4f} {recall:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
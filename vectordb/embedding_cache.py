@@ -0,0 +1,112 @@
+import os
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, List, Optional
+
+
+def content_hash(text: str) -> str:
+    """Stable key for a piece of text (same text -> same embedding)"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Bounded LRU of text hash -> final (normalized) embedding, shared by the
+    search and ingest paths so short repeated messages ("hi", "weather in
+    London") are only encoded once. Optionally saved to / loaded from an
+    .npz file; a file written for another model or metric is ignored.
+    """
+
+    def __init__(self, max_size: int = 10000, path: Optional[str] = None, signature: str = ""):
+        self.max_size = max_size
+        self.path = Path(path) if path else None
+        self.signature = signature
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if self.path is not None:
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def encode(self, texts: List[str], encoder: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """Embeddings for `texts`, calling `encoder` once for the distinct uncached ones"""
+        keys = [content_hash(text) for text in texts]
+        found = {}
+        with self._lock:
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = vector
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        self.hits += len(texts) - sum(1 for key in keys if key in missing)
+        self.misses += len(missing)
+
+        if missing:
+            encoded = encoder(list(missing.values()))
+            found.update(zip(missing.keys(), encoded))
+            if self.max_size > 0:
+                with self._lock:
+                    for key, vector in zip(missing.keys(), encoded):
+                        self._entries[key] = vector
+                        self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_size:
+                        self._entries.popitem(last=False)
+
+        return np.ascontiguousarray(np.vstack([found[key] for key in keys]), dtype="float32")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # ======================================================
+    #   PERSISTENCE
+    # ======================================================
+    def save(self):
+        if self.path is None:
+            return
+        with self._lock:
+            keys = np.array(list(self._entries.keys()), dtype="S32")
+            vectors = np.vstack(list(self._entries.values())) if self._entries else np.empty((0, 0), dtype="float32")
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, keys=keys, vectors=vectors, signature=np.array(self.signature))
+        os.replace(tmp, self.path)
+
+    def load(self):
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with np.load(self.path) as data:
+                if str(data["signature"]) != self.signature:
+                    print(f"Embedding cache {self.path.name} was written for another model, ignoring it")
+                    return
+                keys, vectors = data["keys"], data["vectors"]
+                # Keep the most recently used entries when the file is larger than the cap
+                start = max(0, len(keys) - self.max_size)
+                with self._lock:
+                    for key, vector in zip(keys[start:], vectors[start:]):
+                        self._entries[key.decode("ascii")] = vector
+        except Exception as e:
+            print(f"Embedding cache: could not load {self.path}: {e}")
+
+    def get_stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "persistent": self.path is not None,
+        }
@@ -0,0 +1,126 @@
+import os
+import numpy as np
+from pathlib import Path
+from typing import List, Tuple
+
+# EMBEDDING_MODEL is "<backend>:<model>" or just "<model>" (= sentence-transformers)
+EMBEDDING_BACKENDS = ("st", "st-int8", "onnx", "onnx-int8")
+
+
+def parse_model_spec(spec: str) -> Tuple[str, str]:
+    backend, sep, model = spec.partition(":")
+    if sep and backend.lower() in EMBEDDING_BACKENDS:
+        return backend.lower(), model
+    return "st", spec
+
+
+def hub_repo_id(model: str) -> str:
+    """Short sentence-transformers names live under the sentence-transformers org on the HF hub"""
+    return model if "/" in model else f"sentence-transformers/{model}"
+
+
+class EmbeddingBackend:
+    """Turns a batch of texts into an (n, dimension) float32 matrix"""
+
+    name = "base"
+    dimension = 0
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        raise NotImplementedError
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """The original PyTorch encoder, optionally with int8 dynamic quantization of the Linear layers"""
+
+    def __init__(self, model: str, quantize: bool = False):
+        # Imported here: pulling in torch costs seconds, only pay it when this backend is used
+        from sentence_transformers import SentenceTransformer
+
+        self.name = "st-int8" if quantize else "st"
+        self.model = SentenceTransformer(model)
+        if quantize:
+            import torch
+            self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return np.ascontiguousarray(self.model.encode(texts, convert_to_numpy=True), dtype="float32")
+
+
+class OnnxBackend(EmbeddingBackend):
+    """
+    ONNX Runtime encoder (no torch at runtime). Reproduces the
+    sentence-transformers pipeline for MiniLM-style models: tokenize,
+    transformer, attention-masked mean pooling, L2 normalization.
+
+    `model` is either a local directory holding model.onnx + tokenizer.json
+    or a hub model whose repository ships an onnx/model.onnx export. With
+    quantize=True the graph is int8-quantized once (dynamic quantization)
+    and the result is kept in cache_dir.
+    """
+
+    def __init__(self, model: str, quantize: bool = False, cache_dir: str = "./data/models",
+                 max_seq_length: int = 256, threads: int = 0):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.name = "onnx-int8" if quantize else "onnx"
+        model_path, tokenizer_path = self._resolve_files(model)
+        if quantize:
+            model_path = self._quantized(model_path, Path(cache_dir) / hub_repo_id(model).replace("/", "--"))
+
+        self.tokenizer = Tokenizer.from_file(str(tokenizer_path))
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        self.tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.dimension = int(self.session.get_outputs()[0].shape[-1])
+
+    @staticmethod
+    def _resolve_files(model: str) -> Tuple[Path, Path]:
+        local = Path(model)
+        if local.is_dir():
+            return local / "model.onnx", local / "tokenizer.json"
+        from huggingface_hub import hf_hub_download
+        repo = hub_repo_id(model)
+        return Path(hf_hub_download(repo, "onnx/model.onnx")), Path(hf_hub_download(repo, "tokenizer.json"))
+
+    @staticmethod
+    def _quantized(model_path: Path, target_dir: Path) -> Path:
+        target = target_dir / "model_int8.onnx"
+        if not target.exists():
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            target_dir.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(target.name + ".tmp")
+            quantize_dynamic(str(model_path), str(tmp), weight_type=QuantType.QInt8)
+            os.replace(tmp, target)
+            print(f"Embedding backend: wrote int8 model to {target}")
+        return target
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype="int64")
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype="int64")
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype="int64")
+
+        token_embeddings = self.session.run(None, feeds)[0]
+        # Mean pooling over real (non-padding) tokens, then L2 normalization
+        mask = attention_mask[..., None].astype("float32")
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return np.ascontiguousarray(pooled, dtype="float32")
+
+
+def create_embedding_backend(spec: str, cache_dir: str = "./data/models", threads: int = 0) -> EmbeddingBackend:
+    """Build the backend selected by EMBEDDING_MODEL, e.g. all-MiniLM-L6-v2 or onnx-int8:all-MiniLM-L6-v2"""
+    backend, model = parse_model_spec(spec)
+    if backend in ("onnx", "onnx-int8"):
+        return OnnxBackend(model, quantize=backend == "onnx-int8", cache_dir=cache_dir, threads=threads)
+    return SentenceTransformerBackend(model, quantize=backend == "st-int8")
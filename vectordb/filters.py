@@ -0,0 +1,294 @@
+import json
+import numpy as np
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+TimeBound = Union[datetime, float, int, None]
+
+
+def to_epoch(value: TimeBound) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value)
+
+
+def parse_timestamp(value) -> float:
+    if not value:
+        return np.nan
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class _Column:
+    """Append-only numpy column with amortized growth"""
+
+    def __init__(self, dtype, fill, values: Optional[np.ndarray] = None):
+        self.dtype = dtype
+        self.fill = fill
+        self._data = np.array(values if values is not None else [], dtype=dtype)
+        self.size = len(self._data)
+
+    def extend(self, values: List):
+        needed = self.size + len(values)
+        if needed > len(self._data):
+            grown = np.full(max(needed, 2 * len(self._data), 1024), self.fill, dtype=self.dtype)
+            grown[:self.size] = self._data[:self.size]
+            self._data = grown
+        self._data[self.size:needed] = values
+        self.size = needed
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._data[:self.size]
+
+
+class AttributeIndex:
+    """
+    Per-row session / timestamp / role columns for filtered vector search.
+
+    Sessions and roles are dictionary-encoded, every session keeps the list
+    of its row ids, so restricting a search to one session touches only
+    that session's rows. Rows are also keyed by (session, content hash) so
+    a repeated message bumps the occurrence count of its first row instead
+    of being stored again. Deleted rows are tombstoned here until the next
+    checkpoint drops them. Persisted with each checkpoint as attributes.npz.
+
+    Every row also carries a document id that survives compaction (row ids
+    are renumbered, document ids are not); ids only grow, so the id column
+    is sorted and id -> row is a binary search.
+    """
+
+    def __init__(self):
+        self.sessions: List[str] = []
+        self.roles: List[str] = []
+        self._session_codes: Dict[str, int] = {}
+        self._role_codes: Dict[str, int] = {}
+        self.session_col = _Column("int32", -1)
+        self.time_col = _Column("float64", np.nan)
+        self.role_col = _Column("int16", -1)
+        self.content_col = _Column("S32", b"")
+        self.count_col = _Column("int32", 1)
+        self.last_seen_col = _Column("float64", np.nan)
+        self.deleted_col = _Column("bool", False)
+        self.id_col = _Column("int64", -1)
+        self.next_id = 0
+        self.tombstones = 0
+        self.session_rows: Dict[int, List[int]] = {}
+        self.rows_by_content: Dict[Tuple[int, bytes], int] = {}
+
+    def __len__(self) -> int:
+        return self.session_col.size
+
+    @staticmethod
+    def _code(value: Optional[str], names: List[str], codes: Dict[str, int]) -> int:
+        if value is None:
+            return -1
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(names)
+            names.append(value)
+        return code
+
+    def append(self, metadata_list: Iterable[dict]):
+        start = len(self)
+        sessions, times, roles, contents, ids = [], [], [], [], []
+        for offset, meta in enumerate(metadata_list):
+            # Rows stored before documents had ids get the next one, the same in every replay
+            doc_id = meta.get("doc_id")
+            doc_id = self.next_id if doc_id is None else int(doc_id)
+            self.next_id = max(self.next_id, doc_id + 1)
+            ids.append(doc_id)
+            code = self._code(meta.get("session_id"), self.sessions, self._session_codes)
+            sessions.append(code)
+            times.append(parse_timestamp(meta.get("timestamp")))
+            roles.append(self._code(meta.get("role"), self.roles, self._role_codes))
+            content = (meta.get("content_hash") or "").encode("ascii")
+            contents.append(content)
+            if code >= 0:
+                self.session_rows.setdefault(code, []).append(start + offset)
+            if content:
+                self.rows_by_content.setdefault((code, content), start + offset)
+        self.session_col.extend(sessions)
+        self.time_col.extend(times)
+        self.role_col.extend(roles)
+        self.content_col.extend(contents)
+        self.count_col.extend([1] * len(sessions))
+        self.last_seen_col.extend(times)
+        self.deleted_col.extend([False] * len(sessions))
+        self.id_col.extend(ids)
+
+    def rows_for_ids(self, doc_ids: Iterable[int]) -> np.ndarray:
+        """Current row ids of the given document ids (unknown ids are skipped)"""
+        doc_ids = np.asarray(list(doc_ids), dtype="int64")
+        values = self.id_col.values
+        rows = np.searchsorted(values, doc_ids)
+        found = rows < len(values)
+        rows, doc_ids = rows[found], doc_ids[found]
+        return rows[values[rows] == doc_ids].astype("int64")
+
+    def ids_of(self, rows: Iterable[int]) -> np.ndarray:
+        return self.id_col.values[np.asarray(list(rows), dtype="int64")]
+
+    def find(self, session_id: Optional[str], content_hash: str) -> Optional[int]:
+        """Row already holding this text for this session, if any"""
+        code = self._session_codes.get(session_id, -1) if session_id is not None else -1
+        if session_id is not None and code < 0:
+            return None
+        return self.rows_by_content.get((code, content_hash.encode("ascii")))
+
+    def touch(self, row: int, timestamp: Optional[str] = None):
+        """Record one more occurrence of an existing row"""
+        self.count_col.values[row] += 1
+        seen = parse_timestamp(timestamp)
+        if not np.isnan(seen):
+            last = self.last_seen_col.values[row]
+            self.last_seen_col.values[row] = seen if np.isnan(last) else max(last, seen)
+
+    def occurrences(self, row: int) -> int:
+        return int(self.count_col.values[row]) if row < len(self) else 1
+
+    # ======================================================
+    #   DELETION (tombstones)
+    # ======================================================
+    def delete(self, rows: Iterable[int]) -> int:
+        """Tombstone rows, returns how many were not deleted already"""
+        rows = np.unique(np.asarray(list(rows), dtype="int64"))
+        rows = rows[(rows >= 0) & (rows < len(self))]
+        rows = rows[~self.deleted_col.values[rows]]
+        if not len(rows):
+            return 0
+        self.deleted_col.values[rows] = True
+        self.tombstones += len(rows)
+
+        gone = set(rows.tolist())
+        for code in np.unique(self.session_col.values[rows]).tolist():
+            if code in self.session_rows:
+                self.session_rows[code] = [r for r in self.session_rows[code] if r not in gone]
+        for row in gone:
+            key = (int(self.session_col.values[row]), bytes(self.content_col.values[row]))
+            if self.rows_by_content.get(key) == row:
+                del self.rows_by_content[key]
+        return len(rows)
+
+    def deleted_rows(self) -> np.ndarray:
+        return np.flatnonzero(self.deleted_col.values).astype("int64")
+
+    def live_rows(self) -> np.ndarray:
+        return np.flatnonzero(~self.deleted_col.values).astype("int64")
+
+    def subset(self, rows: np.ndarray) -> "AttributeIndex":
+        """Attributes of `rows` only, renumbered 0..len(rows)-1 (used when a checkpoint drops tombstones)"""
+        attrs = AttributeIndex()
+        attrs.sessions, attrs.roles = list(self.sessions), list(self.roles)
+        attrs._session_codes, attrs._role_codes = dict(self._session_codes), dict(self._role_codes)
+        for name in ("session_col", "time_col", "role_col", "content_col", "count_col", "last_seen_col", "id_col"):
+            column = getattr(self, name)
+            setattr(attrs, name, _Column(column.dtype, column.fill, column.values[rows]))
+        attrs.next_id = self.next_id
+        attrs.deleted_col = _Column("bool", False, np.zeros(len(rows), dtype=bool))
+        attrs._reindex()
+        return attrs
+
+    def candidates(
+        self,
+        session_id: Optional[str] = None,
+        since: TimeBound = None,
+        until: TimeBound = None,
+        role: Optional[str] = None,
+    ) -> Optional[np.ndarray]:
+        """Row ids matching every given filter, or None when no filter is set"""
+        since, until = to_epoch(since), to_epoch(until)
+        if session_id is None and since is None and until is None and role is None:
+            return None
+
+        if session_id is not None:
+            code = self._session_codes.get(session_id)
+            if code is None:
+                return np.empty(0, dtype="int64")
+            rows = np.asarray(self.session_rows.get(code, []), dtype="int64")
+            times, roles = self.time_col.values[rows], self.role_col.values[rows]
+        else:
+            rows = None
+            times, roles = self.time_col.values, self.role_col.values
+
+        mask = np.ones(len(times), dtype=bool)
+        if since is not None:
+            mask &= times >= since
+        if until is not None:
+            mask &= times <= until
+        if role is not None:
+            role_code = self._role_codes.get(role)
+            if role_code is None:
+                return np.empty(0, dtype="int64")
+            mask &= roles == role_code
+
+        if rows is None:
+            # Session row lists never hold tombstoned rows, the full columns do
+            mask &= ~self.deleted_col.values
+            return np.flatnonzero(mask).astype("int64")
+        return rows[mask]
+
+    # ======================================================
+    #   PERSISTENCE
+    # ======================================================
+    def save(self, directory: Path):
+        np.savez(
+            directory / "attributes.npz",
+            session=self.session_col.values,
+            time=self.time_col.values,
+            role=self.role_col.values,
+            content=self.content_col.values,
+            count=self.count_col.values,
+            last_seen=self.last_seen_col.values,
+            doc_id=self.id_col.values,
+            next_id=np.array(self.next_id, dtype="int64"),
+            names=np.frombuffer(json.dumps({"sessions": self.sessions, "roles": self.roles}).encode("utf-8"), dtype="uint8"),
+        )
+
+    @classmethod
+    def load(cls, directory: Path) -> Optional["AttributeIndex"]:
+        path = directory / "attributes.npz"
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            names = json.loads(data["names"].tobytes().decode("utf-8"))
+            attrs = cls()
+            attrs.sessions, attrs.roles = names["sessions"], names["roles"]
+            attrs._session_codes = {name: i for i, name in enumerate(attrs.sessions)}
+            attrs._role_codes = {name: i for i, name in enumerate(attrs.roles)}
+            attrs.session_col = _Column("int32", -1, data["session"])
+            attrs.time_col = _Column("float64", np.nan, data["time"])
+            attrs.role_col = _Column("int16", -1, data["role"])
+            n = len(data["session"])
+            files = set(data.files)
+            attrs.content_col = _Column("S32", b"", data["content"] if "content" in files else np.full(n, b"", dtype="S32"))
+            attrs.count_col = _Column("int32", 1, data["count"] if "count" in files else np.ones(n, dtype="int32"))
+            attrs.last_seen_col = _Column("float64", np.nan, data["last_seen"] if "last_seen" in files else data["time"])
+            attrs.id_col = _Column("int64", -1, data["doc_id"] if "doc_id" in files else np.arange(n, dtype="int64"))
+            attrs.next_id = int(data["next_id"]) if "next_id" in files else n
+            # Checkpoints never contain tombstoned rows
+            attrs.deleted_col = _Column("bool", False, np.zeros(n, dtype=bool))
+        attrs._reindex()
+        return attrs
+
+    def _reindex(self):
+        """Rebuild the per-session row lists (one vectorized pass) and the content lookup"""
+        codes = self.session_col.values
+        order = np.argsort(codes, kind="stable")
+        sorted_codes = codes[order]
+        boundaries = np.flatnonzero(np.diff(sorted_codes)) + 1
+        self.session_rows = {}
+        for group in np.split(order, boundaries):
+            if len(group) and codes[group[0]] >= 0:
+                self.session_rows[int(codes[group[0]])] = group.tolist()
+        # First row wins, like append()
+        self.rows_by_content = {}
+        for row in range(len(codes) - 1, -1, -1):
+            content = self.content_col.values[row]
+            if content:
+                self.rows_by_content[(int(codes[row]), bytes(content))] = row
@@ -0,0 +1,195 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+
+class StoreOp:
+    """A store method call (purge, housekeeping, ...) queued behind the pending adds"""
+
+    def __init__(self, method: str, kwargs: Optional[dict] = None):
+        self.method = method
+        self.kwargs = kwargs or {}
+        self.future = asyncio.get_running_loop().create_future()
+
+
+class VectorIngestQueue:
+    """
+    Background ingestion for FAISSVectorStore.
+
+    Request handlers only enqueue (text, metadata). A single worker thread
+    drains the queue in micro-batches, so each batch costs one encode()
+    call and one index append instead of one per message, and none of it
+    runs on the event loop. `get_store` is called on that thread and may
+    block while the store is still warming up; messages keep queueing.
+
+    Deletions and housekeeping go through the same queue and thread, so a
+    session purge always lands after that session's pending messages and
+    compaction never races an index write.
+    """
+
+    def __init__(
+        self,
+        get_store: Callable,
+        batch_size: int = 64,
+        flush_interval: float = 0.05,
+        max_queue: int = 10000,
+        housekeeping_interval: float = 0,
+    ):
+        self.get_store = get_store
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.housekeeping_interval = housekeeping_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._housekeeping_task: Optional[asyncio.Task] = None
+        # One worker thread: index writes stay serialized. Created per start, stop() shuts it down
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.enqueued = 0
+        self.ingested = 0
+        self.batches = 0
+        self.dropped = 0
+        self.failed = 0
+        self.ops = 0
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vector-ingest")
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def start(self):
+        self._ensure_started()
+        if self.housekeeping_interval > 0 and self._housekeeping_task is None:
+            self._housekeeping_task = asyncio.get_running_loop().create_task(self._housekeeping())
+
+    async def stop(self):
+        """Flush whatever is still queued, then stop the worker"""
+        if self._housekeeping_task is not None:
+            self._housekeeping_task.cancel()
+            self._housekeeping_task = None
+        if self._task is not None and not self._task.done():
+            await self._queue.put(None)
+            await self._task
+        self._task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def submit(self, text: str, metadata: Optional[dict] = None) -> bool:
+        """Enqueue one document, never blocks (drops it if the queue is full)"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((text, metadata or {}))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            print("Vector ingest queue full, dropping message")
+            return False
+        self.enqueued += 1
+        return True
+
+    async def submit_op(self, method: str, **kwargs) -> asyncio.Future:
+        """
+        Queue a store call behind everything already submitted. Unlike submit()
+        this waits for room instead of dropping. Await the returned future for
+        the result, or ignore it.
+        """
+        self._ensure_started()
+        op = StoreOp(method, kwargs)
+        await self._queue.put(op)
+        return op.future
+
+    async def purge_session(self, session_id: str) -> asyncio.Future:
+        return await self.submit_op("purge_session", session_id=session_id)
+
+    async def _housekeeping(self):
+        while True:
+            await asyncio.sleep(self.housekeeping_interval)
+            await self.submit_op("housekeeping")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        pending = None
+        while not stopping:
+            item = pending if pending is not None else await self._queue.get()
+            pending = None
+            if item is None:
+                break
+            if isinstance(item, StoreOp):
+                await self._apply(loop, item)
+                continue
+            batch = [item]
+
+            # Collect more messages until the batch is full or the flush window closes
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                if isinstance(item, StoreOp):
+                    # Keep queue order: write the adds collected so far first
+                    pending = item
+                    break
+                batch.append(item)
+
+            await self._flush(loop, batch)
+
+    async def _flush(self, loop, batch: List[tuple]):
+        texts = [text for text, _ in batch]
+        metadata = [meta for _, meta in batch]
+        try:
+            added = await loop.run_in_executor(self._executor, self._add, texts, metadata)
+            if not added:
+                self.dropped += len(batch)
+                return
+            self.ingested += len(batch)
+            self.batches += 1
+        except Exception as e:
+            self.failed += len(batch)
+            print(f"Vector ingest error: {e}")
+
+    def _add(self, texts: List[str], metadata: List[dict]) -> bool:
+        store = self.get_store()
+        if store is None:
+            return False
+        store.add_documents(texts, metadata)
+        return True
+
+    async def _apply(self, loop, op: StoreOp):
+        try:
+            result = await loop.run_in_executor(self._executor, self._call, op)
+            self.ops += 1
+            if not op.future.done():
+                op.future.set_result(result)
+        except Exception as e:
+            print(f"Vector store {op.method} error: {e}")
+            if not op.future.done():
+                op.future.set_exception(e)
+                # Nobody may be awaiting it, don't warn about a never-retrieved exception
+                op.future.exception()
+
+    def _call(self, op: StoreOp):
+        store = self.get_store()
+        if store is None:
+            return None
+        return getattr(store, op.method)(**op.kwargs)
+
+    def get_stats(self) -> dict:
+        return {
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "enqueued": self.enqueued,
+            "ingested": self.ingested,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "ops": self.ops,
+        }
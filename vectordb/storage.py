@@ -0,0 +1,487 @@
+import os
+import json
+import mmap
+import shutil
+import struct
+import zlib
+import pickle
+import faiss
+import numpy as np
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+from vectordb.filters import AttributeIndex
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, one worker per index path
+    fcntl = None
+
+# Segment log record: type (1 byte) | payload length (uint32) | crc32 of payload (uint32) | payload
+RECORD_HEADER = struct.Struct("<cII")
+RECORD_ADD = b"A"  # payload: float32 embedding | JSON {"text": ..., "meta": {..., "doc_id": ...}}
+RECORD_TOUCH = b"T"  # payload: JSON {"id": ..., "timestamp": ...} (one more occurrence of a stored document)
+RECORD_DELETE = b"D"  # payload: JSON {"ids": [...]} (tombstones, dropped at the next checkpoint)
+# Logs written before documents had ids use {"row": ...} / {"rows": [...]}, still replayed
+
+MANIFEST_FILE = "MANIFEST"
+LOCK_FILE = "LOCK"
+
+
+def _fsync_dir(path: Path):
+    """Make a rename inside `path` durable (no-op where directories can't be opened)"""
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write_file_atomic(path: Path, data: bytes):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(path.parent)
+
+
+class DocumentTable:
+    """
+    Documents + metadata addressed by row id.
+
+    Checkpointed rows live in docs.bin (one JSON record per row) with their
+    byte offsets in docs.idx.npy (uint64, N + 1 entries). Both are memory-mapped
+    and a row is only decoded when a search hit asks for it. Rows added
+    after the checkpoint are kept in plain lists.
+    """
+
+    def __init__(self, texts: Optional[List[str]] = None, metadata: Optional[List[dict]] = None):
+        self._offsets: Optional[np.ndarray] = None
+        self._data: Optional[mmap.mmap] = None
+        self._base_count = 0
+        self._texts: List[str] = list(texts or [])
+        self._metadata: List[dict] = list(metadata or [])
+        self._metadata.extend({} for _ in range(len(self._texts) - len(self._metadata)))
+
+    @classmethod
+    def open(cls, directory: Path, lazy: bool = True) -> "DocumentTable":
+        table = cls()
+        offsets = np.load(directory / "docs.idx.npy", mmap_mode="r")
+        count = len(offsets) - 1
+        if count <= 0:
+            return table
+        with open(directory / "docs.bin", "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        table._offsets, table._data, table._base_count = offsets, data, count
+        if not lazy:
+            # Eager mode: decode everything once, drop the mappings
+            for i in range(count):
+                text, meta = table.get(i)
+                table._texts.append(text)
+                table._metadata.append(meta)
+            table._offsets, table._data, table._base_count = None, None, 0
+            data.close()
+        return table
+
+    def __len__(self) -> int:
+        return self._base_count + len(self._texts)
+
+    def get(self, i: int) -> Tuple[str, dict]:
+        if i < self._base_count:
+            start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+            entry = json.loads(self._data[start:end].decode("utf-8"))
+            return entry["text"], entry.get("meta") or {}
+        i -= self._base_count
+        return self._texts[i], self._metadata[i]
+
+    def append(self, texts: List[str], metadata_list: List[dict]):
+        self._texts.extend(texts)
+        self._metadata.extend(metadata_list)
+
+    def __iter__(self) -> Iterator[Tuple[str, dict]]:
+        for i in range(len(self)):
+            yield self.get(i)
+
+    def close(self):
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+
+    @staticmethod
+    def write(directory: Path, rows: Iterable[Tuple[str, dict]], count: int):
+        """Stream rows into docs.bin + docs.idx.npy"""
+        offsets = np.lib.format.open_memmap(directory / "docs.idx.npy", mode="w+", dtype="uint64", shape=(count + 1,))
+        position = 0
+        offsets[0] = 0
+        with open(directory / "docs.bin", "wb") as f:
+            for i, (text, meta) in enumerate(rows):
+                record = json.dumps({"text": text, "meta": meta}).encode("utf-8")
+                f.write(record)
+                position += len(record)
+                offsets[i + 1] = position
+            f.flush()
+            os.fsync(f.fileno())
+        offsets.flush()
+        del offsets
+
+
+class SegmentLogStorage:
+    """
+    Append-only on-disk format for FAISSVectorStore.
+
+    index_path/
+        MANIFEST              -> {"generation": n, "checkpoint": ..., "log": ...}
+        checkpoint-00000n/    -> full snapshot (embeddings.npy, docs.bin, docs.idx.npy, attributes.npz)
+        segment-00000n.log    -> records appended since that snapshot
+
+    Each add appends O(batch) bytes to the segment log. Once the log holds
+    `compact_every` records a new checkpoint generation is written next to
+    the old one and the MANIFEST is swapped atomically, so a crash at any
+    point leaves either the old or the new generation intact. A torn record
+    at the tail of the log (crash mid-append) is detected by its CRC and
+    truncated on load.
+
+    Several workers may share one path. Every write (append, delete,
+    checkpoint, stale-file cleanup) happens inside writer(), an exclusive
+    fcntl lock on index_path/LOCK, and the caller catches up with the
+    other workers' records first (poll() / replay_tail(), or a full load()
+    when the generation moved), so the log is one totally ordered history.
+    Readers need no lock: they stop at the last complete record.
+    """
+
+    def __init__(self, path: str, dimension: int, compact_every: int = 10000, fsync: bool = True):
+        self.path = Path(path)
+        self.dimension = dimension
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self.generation = 0
+        self.checkpoint_dir: Path = self.path
+        self.log_file: Path = self.path / self._log_name(0)
+        self.log_records = 0
+        self.log_offset = 0  # bytes of the current log already replayed or written by us
+        self._log = None
+        self._lock_file = None
+        self._lock_depth = 0
+
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def _checkpoint_name(generation: int) -> str:
+        return f"checkpoint-{generation:06d}"
+
+    @staticmethod
+    def _log_name(generation: int) -> str:
+        return f"segment-{generation:06d}.log"
+
+    # ======================================================
+    #   WRITER LOCK
+    # ======================================================
+    @contextmanager
+    def writer(self):
+        """
+        Exclusive write access across processes (reentrant within this one; the
+        caller serializes its own threads). Blocks while another worker writes.
+        """
+        if self._lock_depth == 0 and fcntl is not None:
+            if self._lock_file is None:
+                self._lock_file = open(self.path / LOCK_FILE, "a+b")
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+        self._lock_depth += 1
+        try:
+            yield
+        finally:
+            self._lock_depth -= 1
+            if self._lock_depth == 0 and fcntl is not None:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    @property
+    def locked(self) -> bool:
+        return self._lock_depth > 0
+
+    def _read_manifest(self) -> Optional[dict]:
+        try:
+            return json.loads((self.path / MANIFEST_FILE).read_text())
+        except FileNotFoundError:
+            return None
+
+    def poll(self) -> Optional[str]:
+        """What other workers changed since we last looked: "reload" (new generation), "tail" (new log records) or None"""
+        manifest = self._read_manifest()
+        if (manifest["generation"] if manifest else 0) != self.generation:
+            return "reload"
+        try:
+            size = self.log_file.stat().st_size
+        except FileNotFoundError:
+            return None
+        return "tail" if size > self.log_offset else None
+
+    # ======================================================
+    #   LOAD
+    # ======================================================
+    def load(self, mmap_mode: bool = False) -> Tuple[
+        Optional[np.ndarray], DocumentTable, Optional[np.ndarray], AttributeIndex
+    ]:
+        """
+        Returns (checkpoint embeddings or None, documents, embeddings appended since the checkpoint,
+        filter attributes). With mmap_mode the checkpoint embeddings and documents are memory-mapped
+        instead of read into RAM. Documents and attributes already include the replayed log records,
+        rows deleted since the checkpoint are tombstoned in the attributes.
+        """
+        for attempt in range(3):
+            try:
+                return self._load(mmap_mode)
+            except FileNotFoundError:
+                # Without the lock, a writer may retire the generation we were reading: read the new one
+                if self.locked or attempt == 2:
+                    raise
+
+    def _load(self, mmap_mode: bool):
+        self.close()
+        manifest = self._read_manifest()
+        if manifest is not None:
+            self.generation = manifest["generation"]
+            self.checkpoint_dir = self.path / manifest["checkpoint"]
+            self.log_file = self.path / manifest["log"]
+        else:
+            # Legacy layout (index.faiss + pickles at the top level) acts as generation 0
+            self.generation = 0
+            self.checkpoint_dir = self.path
+            self.log_file = self.path / self._log_name(0)
+
+        if self.locked:
+            # Only safe under the lock: anything outside our MANIFEST is then truly abandoned
+            self._remove_stale_generations()
+
+        embeddings, documents, attributes = None, DocumentTable(), None
+        if (self.checkpoint_dir / "embeddings.npy").exists():
+            embeddings = np.load(self.checkpoint_dir / "embeddings.npy", mmap_mode="r" if mmap_mode else None)
+            documents = DocumentTable.open(self.checkpoint_dir, lazy=mmap_mode)
+            attributes = AttributeIndex.load(self.checkpoint_dir)
+        elif (self.checkpoint_dir / "index.faiss").exists():
+            embeddings, documents = self._load_pickle_checkpoint()
+
+        self.log_offset = self.log_records = 0
+        vectors, texts, metadata, edits = self._read_log()
+        documents.append(texts, metadata)
+
+        # Checkpoints without attributes.npz (older layouts) get them rebuilt from the metadata
+        if attributes is None:
+            attributes = AttributeIndex()
+        attributes.append(documents.get(i)[1] for i in range(len(attributes), len(documents)))
+        self._apply_edits(edits, attributes)
+        return embeddings, documents, vectors, attributes
+
+    def replay_tail(self, documents: DocumentTable, attributes: AttributeIndex) -> Optional[np.ndarray]:
+        """Apply records other workers appended since our last read; returns their embeddings"""
+        vectors, texts, metadata, edits = self._read_log()
+        documents.append(texts, metadata)
+        attributes.append(metadata)
+        self._apply_edits(edits, attributes)
+        return vectors
+
+    def _load_pickle_checkpoint(self) -> Tuple[np.ndarray, DocumentTable]:
+        """Older checkpoints: index.faiss + documents.pkl + metadata.pkl (rewritten at the next checkpoint)"""
+        index = faiss.read_index(str(self.checkpoint_dir / "index.faiss"))
+        embeddings = index.reconstruct_n(0, index.ntotal) if index.ntotal else None
+        texts, metadata = [], []
+        docs_file = self.checkpoint_dir / "documents.pkl"
+        meta_file = self.checkpoint_dir / "metadata.pkl"
+        if docs_file.exists():
+            with open(docs_file, "rb") as f:
+                texts = pickle.load(f)
+        if meta_file.exists():
+            with open(meta_file, "rb") as f:
+                metadata = pickle.load(f)
+        return embeddings, DocumentTable(texts, metadata)
+
+    def _read_log(self) -> Tuple[Optional[np.ndarray], List[str], List[dict], List[Tuple[bytes, dict]]]:
+        """
+        Complete records from log_offset on: (embeddings, texts, metadata of the adds,
+        touch/delete records in log order). An incomplete tail is left for the next read,
+        or truncated when we hold the lock (then it is a torn write, nobody is mid-append).
+        """
+        vectors, texts, metadata, edits = [], [], [], []
+        try:
+            with open(self.log_file, "rb") as f:
+                f.seek(self.log_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return None, texts, metadata, edits
+
+        embedding_bytes = self.dimension * 4
+        offset = 0
+        while offset + RECORD_HEADER.size <= len(data):
+            record_type, length, crc = RECORD_HEADER.unpack_from(data, offset)
+            start = offset + RECORD_HEADER.size
+            payload = data[start:start + length]
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                break
+            if record_type == RECORD_ADD:
+                vectors.append(np.frombuffer(payload[:embedding_bytes], dtype="float32"))
+                entry = json.loads(payload[embedding_bytes:].decode("utf-8"))
+                texts.append(entry["text"])
+                metadata.append(entry.get("meta") or {})
+            elif record_type in (RECORD_TOUCH, RECORD_DELETE):
+                edits.append((record_type, json.loads(payload.decode("utf-8"))))
+            self.log_records += 1
+            offset = start + length
+
+        if offset < len(data) and self.locked:
+            print(f"Vector log {self.log_file.name}: dropping {len(data) - offset} bytes of torn/corrupt tail")
+            with open(self.log_file, "r+b") as f:
+                f.truncate(self.log_offset + offset)
+        self.log_offset += offset
+        return (np.vstack(vectors) if vectors else None), texts, metadata, edits
+
+    @staticmethod
+    def _apply_edits(edits: List[Tuple[bytes, dict]], attributes: AttributeIndex):
+        for record_type, entry in edits:
+            if record_type == RECORD_TOUCH:
+                rows = attributes.rows_for_ids([entry["id"]]) if "id" in entry else [entry["row"]]
+                for row in rows:
+                    attributes.touch(int(row), entry.get("timestamp"))
+            else:
+                attributes.delete(attributes.rows_for_ids(entry["ids"]) if "ids" in entry else entry["rows"])
+
+    def _remove_stale_generations(self):
+        """Delete leftovers of interrupted or superseded checkpoints"""
+        keep = {self.checkpoint_dir.name, self.log_file.name, MANIFEST_FILE}
+        for entry in self.path.iterdir():
+            is_generation = entry.name.startswith("checkpoint-") or entry.name.startswith("segment-")
+            if (is_generation or entry.name.endswith(".tmp")) and entry.name not in keep:
+                if entry.is_dir():
+                    shutil.rmtree(entry, ignore_errors=True)
+                else:
+                    entry.unlink(missing_ok=True)
+
+    # ======================================================
+    #   APPEND
+    # ======================================================
+    def append(
+        self,
+        embeddings: np.ndarray,
+        texts: List[str],
+        metadata_list: List[dict],
+        touches: Iterable[Tuple[int, Optional[str]]] = (),
+    ):
+        """
+        Append one batch (new documents + repeat occurrences of stored ones, by document id)
+        to the segment log, a single write + fsync. Caller holds writer().
+        """
+        buffer = bytearray()
+        records = len(texts)
+        for vector, text, meta in zip(embeddings, texts, metadata_list):
+            payload = (
+                np.ascontiguousarray(vector, dtype="float32").tobytes()
+                + json.dumps({"text": text, "meta": meta}).encode("utf-8")
+            )
+            buffer += RECORD_HEADER.pack(RECORD_ADD, len(payload), zlib.crc32(payload))
+            buffer += payload
+        for doc_id, timestamp in touches:
+            payload = json.dumps({"id": int(doc_id), "timestamp": timestamp}).encode("utf-8")
+            buffer += RECORD_HEADER.pack(RECORD_TOUCH, len(payload), zlib.crc32(payload))
+            buffer += payload
+            records += 1
+        self._write(buffer, records)
+
+    def delete(self, doc_ids: List[int]):
+        """Log tombstones by document id (caller holds writer())"""
+        if not doc_ids:
+            return
+        payload = json.dumps({"ids": [int(doc_id) for doc_id in doc_ids]}).encode("utf-8")
+        self._write(RECORD_HEADER.pack(RECORD_DELETE, len(payload), zlib.crc32(payload)) + payload, 1)
+
+    def _write(self, buffer: bytes, records: int):
+        if not buffer:
+            return
+        if self._log is None:
+            self._log = open(self.log_file, "ab")
+        self._log.write(buffer)
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+        self.log_records += records
+        self.log_offset += len(buffer)
+
+    def needs_compaction(self) -> bool:
+        return self.log_records >= self.compact_every
+
+    # ======================================================
+    #   CHECKPOINT / COMPACTION
+    # ======================================================
+    def write_checkpoint(
+        self,
+        embedding_chunks: Iterable[np.ndarray],
+        count: int,
+        documents: DocumentTable,
+        attributes: AttributeIndex,
+    ):
+        """Snapshot the full store as a new generation and start an empty segment log (caller holds writer())"""
+        generation = self.generation + 1
+        checkpoint_dir = self.path / self._checkpoint_name(generation)
+        tmp_dir = self.path / (checkpoint_dir.name + ".tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir()
+
+        # Stream embeddings straight into an .npy file, never holding the whole matrix in RAM
+        vectors = np.lib.format.open_memmap(
+            tmp_dir / "embeddings.npy", mode="w+", dtype="float32", shape=(count, self.dimension)
+        )
+        row = 0
+        for chunk in embedding_chunks:
+            vectors[row:row + len(chunk)] = chunk
+            row += len(chunk)
+        vectors.flush()
+        del vectors
+
+        DocumentTable.write(tmp_dir, documents, count)
+        attributes.save(tmp_dir)
+        for name in ("embeddings.npy", "docs.idx.npy", "attributes.npz"):
+            with open(tmp_dir / name, "rb") as f:
+                os.fsync(f.fileno())
+        os.replace(tmp_dir, checkpoint_dir)
+
+        log_file = self.path / self._log_name(generation)
+        log_file.write_bytes(b"")
+        _fsync_dir(self.path)
+
+        # The MANIFEST swap is the commit point
+        manifest = {"generation": generation, "checkpoint": checkpoint_dir.name, "log": log_file.name}
+        _write_file_atomic(self.path / MANIFEST_FILE, json.dumps(manifest).encode("utf-8"))
+
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        old_checkpoint, old_log = self.checkpoint_dir, self.log_file
+        self.generation = generation
+        self.checkpoint_dir = checkpoint_dir
+        self.log_file = log_file
+        self.log_records = 0
+        self.log_offset = 0
+
+        if old_checkpoint == self.path:
+            # Migrated from the legacy layout
+            for name in ("index.faiss", "documents.pkl", "metadata.pkl"):
+                (self.path / name).unlink(missing_ok=True)
+        else:
+            shutil.rmtree(old_checkpoint, ignore_errors=True)
+        old_log.unlink(missing_ok=True)
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def get_stats(self) -> dict:
+        return {
+            "generation": self.generation,
+            "log_records": self.log_records,
+            "compact_every": self.compact_every,
+        }